@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import sys
+import io
+import contextlib
+import time
+from copy import deepcopy
+import tableau
+import interpretation
+
+
+"""
+Benchmark of the cost of creating new branches of the tableau ("alternative interpretations").
+
+For the most branch-heavy concepts of a dataset, the tableau is built, and every time a branching rule forks the
+interpretation, the time of the fork is measured, together with the time that a deepcopy of the same interpretation
+(used before copy-on-write interpretations were introduced) would take.
+
+Usage: python benchmark_branching.py [dataset] [number of concepts]
+"""
+
+
+#1. Preparation ----------------
+
+dataset = sys.argv[1] if len(sys.argv) > 1 else '../data/GD_0.5.csv'
+no_formulas = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+data = pd.read_csv(dataset)
+
+#the most branch-heavy concepts, that did not end with a time-out
+data = data[data['time_out'] == False].sort_values('no_branches_explored', ascending = False).head(no_formulas)
+
+
+#measuring both ways of copying the interpretation at every branch point
+fork = interpretation.Interpretation.fork
+measurements = {'forks': 0, 'time_fork': 0.0, 'time_deepcopy': 0.0}
+
+def measured_fork(self):
+    start = time.perf_counter()
+    deepcopy(self)
+    measurements['time_deepcopy'] += time.perf_counter() - start
+
+    start = time.perf_counter()
+    new = fork(self)
+    measurements['time_fork'] += time.perf_counter() - start
+
+    measurements['forks'] += 1
+    return new
+
+interpretation.Interpretation.fork = measured_fork
+
+
+
+#2. Building the tableaux ----------------
+
+results = []
+
+for row in data.itertuples():
+
+    for key in measurements:
+        measurements[key] = 0
+
+    tab = tableau.DL_Tableau(concept = row.formula)
+
+    with contextlib.redirect_stdout(io.StringIO()):  #the print-out of the interpretation is not needed here
+        tab_result = tab.build_tableau()
+
+    results.append({'no_atoms': row.no_atoms,
+                    'no_branches_explored': row.no_branches_explored,
+                    'forks': measurements['forks'],
+                    'time_fork': measurements['time_fork'],
+                    'time_deepcopy': measurements['time_deepcopy'],
+                    'speed_up': measurements['time_deepcopy'] / measurements['time_fork'] if measurements['forks'] else np.nan,
+                    'time_out': tab_result[0],
+                    'is_satisfiable': tab_result[1]})
+
+
+
+#3. Results ----------------
+
+results = pd.DataFrame(results)
+
+pd.set_option('display.width', 200)
+print(results.to_string(index = False, float_format = lambda x: f"{x:.4f}"))
+print(f"\nTotal time of forks: {results['time_fork'].sum():.4f}s, total time of deep copies: {results['time_deepcopy'].sum():.4f}s "
+      f"(speed-up: {results['time_deepcopy'].sum() / results['time_fork'].sum():.1f}x)")
@@ -0,0 +1,75 @@
+import pandas as pd
+import sys
+import glob
+import time
+import tableau
+from heuristics import HEURISTICS
+
+
+"""
+Comparison of the branching heuristics (see the script "heuristics" and the argument "heuristic" of build_tableau): for
+the concepts of the datasets, the tableau is built with each heuristic, and the numbers of time-outs, the numbers of
+applied rules and the times are compared. All the heuristics have to give the same satisfiability status (unless some
+of them are time-outs).
+
+Usage: python benchmark_heuristics.py [datasets (a glob pattern)] [number of concepts of each dataset] [time limit]
+"""
+
+
+#1. Preparation ----------------
+
+datasets = sys.argv[1] if len(sys.argv) > 1 else '../data/*.csv'
+no_formulas = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+time_limit = float(sys.argv[3]) if len(sys.argv) > 3 else 12
+
+
+
+#2. Building the tableaux ----------------
+
+results = []
+
+for dataset in sorted(glob.glob(datasets)):
+
+    data = pd.read_csv(dataset).head(no_formulas)
+
+    for row in data.itertuples():
+
+        statuses = set()
+        for heuristic in HEURISTICS:
+            tab = tableau.DL_Tableau(concept = row.formula)
+            start = time.perf_counter()
+            result = tab.build_tableau(heuristic = heuristic, time_limit = time_limit)
+            results.append({'dataset': dataset,
+                            'heuristic': heuristic,
+                            'time_out': result.time_out,
+                            'rules': result.no_rules_applied,
+                            'closed': result.closed_branches_count,
+                            'time': time.perf_counter() - start})
+            if not result.time_out:
+                statuses.add(result.is_satisfiable)
+
+        if len(statuses) > 1:
+            raise AssertionError(f"The heuristics gave different satisfiability of the concept: {row.formula}")
+
+
+
+#3. Results ----------------
+
+results = pd.DataFrame(results)
+
+#the numbers of applied rules are summed only over the concepts for which none of the heuristics was a time-out
+results['concept'] = results.index // len(HEURISTICS)
+finished = results[~results.groupby('concept')['time_out'].transform('any')]
+
+summary = results.groupby(['dataset', 'heuristic']).agg(concepts = ('time_out', 'size'),
+                                                        time_outs = ('time_out', 'sum'),
+                                                        time = ('time', 'sum'))
+summary = summary.join(finished.groupby(['dataset', 'heuristic']).agg(rules = ('rules', 'sum'), closed = ('closed', 'sum')))
+
+totals = results.groupby('heuristic').agg(time_outs = ('time_out', 'sum'), time = ('time', 'sum'))
+totals = totals.join(finished.groupby('heuristic').agg(rules = ('rules', 'sum'), closed = ('closed', 'sum')))
+
+pd.set_option('display.width', 200)
+print(summary.to_string(float_format = lambda x: f"{x:.2f}"))
+print("\nAll datasets:")
+print(totals.to_string(float_format = lambda x: f"{x:.2f}"))
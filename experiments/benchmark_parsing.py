@@ -0,0 +1,69 @@
+import pandas as pd
+import sys
+import glob
+import time
+from lark import Lark
+import forms
+
+
+"""
+Benchmark of parsing concepts: the LALR parser "parser_DL" (with the transformer "ToFml" built in) is compared with 
+the default Earley parser of Lark for the same grammar, followed by a separate pass of the transformer (the way the 
+concepts were parsed before). For every concept, both parsers have to return the same formula object.
+
+Usage: python benchmark_parsing.py [datasets (a glob pattern)] [number of concepts of each dataset; 'all' - all of them]
+"""
+
+
+#1. Preparation ----------------
+
+datasets = sys.argv[1] if len(sys.argv) > 1 else '../data/*.csv'
+no_formulas = sys.argv[2] if len(sys.argv) > 2 else '20'   #note - the Earley parser takes approx. 0.5s for a concept with 100 atoms
+
+parser_earley = Lark(forms.grammar_DL, start = "fml")
+
+
+
+#2. Parsing the concepts ----------------
+
+results = []
+
+for dataset in sorted(glob.glob(datasets)):
+
+    data = pd.read_csv(dataset)
+    if no_formulas != 'all':
+        data = data.head(int(no_formulas))
+
+    for row in data.itertuples():
+
+        start = time.perf_counter()
+        fml_earley = forms.ToFml().transform(parser_earley.parse(row.formula))
+        time_earley = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fml_lalr = forms.parser_DL.parse(row.formula)
+        time_lalr = time.perf_counter() - start
+
+        if fml_lalr is not fml_earley:
+            raise AssertionError(f"The parsers give different formulas for the concept: {row.formula}")
+
+        results.append({'dataset': dataset,
+                        'no_atoms': row.no_atoms,
+                        'time_earley': time_earley,
+                        'time_lalr': time_lalr})
+
+
+
+#3. Results ----------------
+
+results = pd.DataFrame(results)
+summary = results.groupby('dataset').agg(concepts = ('no_atoms', 'size'), 
+                                         avg_no_atoms = ('no_atoms', 'mean'),
+                                         time_earley = ('time_earley', 'sum'),
+                                         time_lalr = ('time_lalr', 'sum'))
+summary['speed_up'] = summary['time_earley'] / summary['time_lalr']
+
+pd.set_option('display.width', 200)
+print(summary.to_string(float_format = lambda x: f"{x:.4f}"))
+print(f"\nAll {len(results)} concepts parsed to the same formulas. Total time of the Earley parser: {results['time_earley'].sum():.4f}s, "
+      f"total time of the LALR parser: {results['time_lalr'].sum():.4f}s (speed-up: {results['time_earley'].sum() / results['time_lalr'].sum():.1f}x)")
@@ -0,0 +1,75 @@
+import pandas as pd
+import sys
+import time
+import tableau
+
+
+"""
+Benchmark of the semantic branching of negated conjunctions (see the argument "semantic_branching" of build_tableau):
+for the concepts of a dataset, the tableau is built with the syntactic branching (options ~C and ~D) and with the
+semantic branching (options ~C and (C, ~D)), and the numbers of closed branches, the numbers of applied rules and the
+times are compared - for all the concepts, and separately for the unsatisfiable ones, for which the whole tableau has
+to be explored. Both tableaux have to give the same satisfiability status (unless one of them is a time-out).
+
+Usage: python benchmark_semantic_branching.py [dataset] [number of concepts] [time limit]
+"""
+
+
+#1. Preparation ----------------
+
+dataset = sys.argv[1] if len(sys.argv) > 1 else '../data/NoDesc.csv'
+no_formulas = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+time_limit = float(sys.argv[3]) if len(sys.argv) > 3 else 12
+
+data = pd.read_csv(dataset).head(no_formulas)
+
+
+
+#2. Building the tableaux ----------------
+
+results = []
+
+for row in data.itertuples():
+
+    result = {}
+    for mode, semantic_branching in (('syntactic', False), ('semantic', True)):
+        tab = tableau.DL_Tableau(concept = row.formula)
+        start = time.perf_counter()
+        tab_result = tab.build_tableau(semantic_branching = semantic_branching, time_limit = time_limit)
+        result[mode] = (tab_result, time.perf_counter() - start)
+
+    (syntactic, time_syntactic), (semantic, time_semantic) = result['syntactic'], result['semantic']
+    if not (syntactic.time_out or semantic.time_out) and syntactic.is_satisfiable != semantic.is_satisfiable:
+        raise AssertionError(f"The semantic branching changed the satisfiability of the concept: {row.formula}")
+
+    results.append({'time_out': syntactic.time_out or semantic.time_out,
+                    'is_satisfiable': syntactic.is_satisfiable if not syntactic.time_out else semantic.is_satisfiable,
+                    'closed': syntactic.closed_branches_count,
+                    'closed_semantic': semantic.closed_branches_count,
+                    'rules': syntactic.no_rules_applied,
+                    'rules_semantic': semantic.no_rules_applied,
+                    'time': time_syntactic,
+                    'time_semantic': time_semantic,
+                    'time_outs': int(syntactic.time_out),
+                    'time_outs_semantic': int(semantic.time_out)})
+
+
+
+#3. Results ----------------
+
+results = pd.DataFrame(results)
+
+#the numbers of closed branches and applied rules are compared only for the concepts without time-outs
+finished = results[~results['time_out']]
+columns = ['closed', 'closed_semantic', 'rules', 'rules_semantic', 'time', 'time_semantic']
+
+summary = pd.DataFrame({'all concepts': finished[columns].sum(),
+                        'unsatisfiable concepts': finished[finished['is_satisfiable'] == False][columns].sum()}).T
+summary['concepts'] = [len(finished), (finished['is_satisfiable'] == False).sum()]
+summary['closed_reduction'] = 1 - summary['closed_semantic'] / summary['closed']
+summary['time_reduction'] = 1 - summary['time_semantic'] / summary['time']
+
+pd.set_option('display.width', 200)
+print(summary.to_string(float_format = lambda x: f"{x:.4f}"))
+print(f"\nTime-outs: {results['time_outs'].sum()} with the syntactic branching, {results['time_outs_semantic'].sum()} with the semantic branching "
+      f"(out of {len(results)} concepts)")
@@ -0,0 +1,70 @@
+import pandas as pd
+import sys
+import glob
+import tableau
+
+
+"""
+Benchmark of the simplification of concepts (see the script "simplify"): for the concepts of the datasets, the tableau
+is built without and with the simplification, and the sizes of the concepts and the numbers of applied rules are
+compared. Both tableaux have to give the same satisfiability status (unless one of them is a time-out).
+
+Usage: python benchmark_simplification.py [datasets (a glob pattern)] [number of concepts of each dataset]
+"""
+
+
+#1. Preparation ----------------
+
+datasets = sys.argv[1] if len(sys.argv) > 1 else '../data/*.csv'
+no_formulas = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+
+
+#2. Building the tableaux ----------------
+
+results = []
+
+for dataset in sorted(glob.glob(datasets)):
+
+    data = pd.read_csv(dataset).head(no_formulas)
+
+    for row in data.itertuples():
+
+        result = tableau.DL_Tableau(concept = row.formula).build_tableau()
+
+        tab = tableau.DL_Tableau(concept = row.formula, simplify = True)
+        result_simplified = tab.build_tableau()
+
+        if not (result.time_out or result_simplified.time_out) and result.is_satisfiable != result_simplified.is_satisfiable:
+            raise AssertionError(f"The simplification changed the satisfiability of the concept: {row.formula}")
+
+        results.append({'dataset': dataset,
+                        'size_before': tab.size_before_simplification,
+                        'size_after': tab.size_after_simplification,
+                        'time_out': result.time_out,
+                        'time_out_simplified': result_simplified.time_out,
+                        'rules': result.no_rules_applied,
+                        'rules_simplified': result_simplified.no_rules_applied})
+
+
+
+#3. Results ----------------
+
+results = pd.DataFrame(results)
+
+#the numbers of applied rules are compared only for the concepts without time-outs
+finished = results[~(results['time_out'] | results['time_out_simplified'])]
+
+summary = results.groupby('dataset').agg(concepts = ('size_before', 'size'),
+                                         size_before = ('size_before', 'sum'),
+                                         size_after = ('size_after', 'sum'),
+                                         time_outs = ('time_out', 'sum'),
+                                         time_outs_simplified = ('time_out_simplified', 'sum'))
+summary = summary.join(finished.groupby('dataset').agg(rules = ('rules', 'sum'), rules_simplified = ('rules_simplified', 'sum')))
+summary['size_reduction'] = 1 - summary['size_after'] / summary['size_before']
+summary['rules_reduction'] = 1 - summary['rules_simplified'] / summary['rules']
+
+pd.set_option('display.width', 200)
+print(summary.to_string(float_format = lambda x: f"{x:.4f}"))
+print(f"\nTotal size of the concepts: {results['size_before'].sum()} before and {results['size_after'].sum()} after the simplification; "
+      f"applied rules (without time-outs): {finished['rules'].sum()} before and {finished['rules_simplified'].sum()} after the simplification")
@@ -62,8 +62,7 @@ for i in range(no_formulas):
 #2.1. measuring parsing time --
 
 tableau_parser = """ 
-parser_tree = forms.parser_DL.parse(form)
-fml = forms.ToFml().transform(parser_tree)
+fml = forms.parser_DL.parse(form)
 """
 
 for row in data.itertuples():
@@ -85,8 +84,7 @@ for row in data.itertuples():
     
     form = row.formula
     
-    parser_tree = forms.parser_DL.parse(form)
-    fml = forms.ToFml().transform(parser_tree)
+    fml = forms.parser_DL.parse(form)
 
     data.loc[row.Index, 'formula2'] = fml.formula_string()
     data.loc[row.Index, 'modal_depth'] = fml.modal_degree()
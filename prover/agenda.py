@@ -0,0 +1,133 @@
+from collections import deque
+
+
+class Agenda:
+    """Class for the agenda of the tableau - queues of tasks, one queue for each rule.
+
+    Instead of searching all the worlds for formulas to which a rule can be applied, the rules are applied to tasks, 
+    which are added to the agenda when the interpretation changes. Each rule is registered for some events (see the 
+    dictionary "triggers" in the script "rules"):
+        a name of a set of formulas (e.g. 'conjunction') - a formula has been placed in the set in some world; 
+            the task is the pair (world, formula)
+        'box' - a formula ~*E r A has been added to the box subformulas of a world; the task is the pair (world, None), 
+            i.e. the whole world has to be checked
+        'world' - a new world has been added; the task is None, i.e. the whole interpretation has to be checked
+        'label' - a new formula has been added to the label of a world; the task is the pair (world, formula)
+
+    Tasks are taken from the queue of the first rule (in the order of rules given to the agenda) with a non-empty 
+    queue, so the order of the rules is the priority order. The same task is never queued twice for the same rule.
+
+    Formulas from a set are queued in the order of their hashes (which do not depend on the process), not in the order 
+    of iterating over the set, so that the order of applying the rules is the same for a copy of the interpretation 
+    sent to another process (see DL_Tableau._explore_parallel).
+
+    For the branching rules given in "heuristic_rules", the next task is not simply the first one of the queue: the task 
+    with the smallest key computed by the branching heuristic (see the script "heuristics") is taken instead.
+    """
+
+    def __init__(self, rules_to_apply, triggers: dict, heuristic = None, heuristic_rules = ()):
+        self._queues = [deque() for rule in rules_to_apply]   #queues of tasks, in the order of rules
+        self._queued = [set() for rule in rules_to_apply]   #sets of tasks present in the queues, in the order of rules
+        self._heuristic = heuristic   #function computing the keys of tasks; None - the tasks are taken in the order of the queues
+        self._heuristic_priorities = {priority for priority, rule in enumerate(rules_to_apply) if rule in heuristic_rules}
+        self._listeners = {}   #a dictionary with events as keys; values are lists of priorities (indices) of the rules registered for the event
+        for priority, rule in enumerate(rules_to_apply):
+            for event in triggers[rule]:
+                self._listeners.setdefault(event, []).append(priority)
+
+
+    def push(self, priority: int, task):
+        """Add a task to the queue of the rule with the given priority (if it is not queued already)."""
+        queued = self._queued[priority]
+        if task not in queued:
+            queued.add(task)
+            self._queues[priority].append(task)
+
+    def pop(self, interpretation = None):
+        """Remove and return the next task, as a pair (priority of the rule, task); None if the agenda is empty.
+        The interpretation is used by the branching heuristic."""
+        for priority, queue in enumerate(self._queues):
+            if queue:
+                if self._heuristic is not None and priority in self._heuristic_priorities and len(queue) > 1:
+                    task = self._best_task(queue, interpretation)
+                else:
+                    task = queue.popleft()
+                self._queued[priority].discard(task)
+                return (priority, task)
+        return None
+
+    def _best_task(self, queue, interpretation):
+        """Remove and return the task of the queue with the smallest key (the first one among the tasks with equal keys); 
+        tasks without a formula (the whole world or interpretation has to be checked) are taken first."""
+        best_index, best_key = 0, None
+        for index, task in enumerate(queue):
+            if task is None or task[1] is None:
+                best_index = index
+                break
+            key = self._heuristic(interpretation, task)
+            if best_key is None or key < best_key:
+                best_index, best_key = index, key
+        task = queue[best_index]
+        del queue[best_index]
+        return task
+
+    def clear(self):
+        """Remove all tasks from the agenda."""
+        for queue, queued in zip(self._queues, self._queued):
+            queue.clear()
+            queued.clear()
+
+
+
+    #EVENTS - called by the worlds and the interpretation to which the agenda is attached (see Interpretation.set_agenda)
+
+    def formula_added(self, world, category: str, fml, new_in_label: bool):
+        """A formula has been placed in the set "category" of the world (new_in_label: it is a new formula of the world)."""
+        for priority in self._listeners.get(category, ()):
+            self.push(priority, (world, fml))
+        if new_in_label:
+            for priority in self._listeners.get('label', ()):
+                self.push(priority, (world, fml))
+
+    def box_subformula_added(self, world):
+        """A new formula ~*E r A has been added to the box subformulas of the world."""
+        for priority in self._listeners.get('box', ()):
+            self.push(priority, (world, None))
+
+    def world_added(self, world):
+        """A new world (with its formulas) has been added to the interpretation."""
+        for category, fmls in world._formulas.items():
+            for fml in sorted(fmls, key = hash):
+                self.formula_added(world, category, fml, True)
+        for priority in self._listeners.get('world', ()):
+            self.push(priority, None)
+
+    def snapshot(self):
+        """Return a copy of all the tasks (in the order of rules), with worlds identified by their identifiers, so that the 
+        tasks can be restored for another copy of the interpretation (see restore)."""
+        return [[task if task is None else (task[0]._id, task[1]) for task in queue] for queue in self._queues]
+
+    def restore(self, snapshot: list, interpretation):
+        """Replace all tasks with the tasks from a snapshot, taken for the interpretation (or a copy of it) at a branching 
+        point of the tableau; used when the tableau starts to explore another option of that branching rule."""
+        worlds = interpretation._worlds_by_id
+        for priority, tasks in enumerate(snapshot):
+            self._queues[priority] = deque(task if task is None else (worlds[task[0]], task[1]) for task in tasks)
+            self._queued[priority] = set(self._queues[priority])
+
+    def refill(self, interpretation):
+        """Replace all tasks with the tasks for the whole interpretation, as if all its formulas and worlds were new 
+        (used when the tableau starts to build the interpretation)."""
+        self.clear()
+        categories = [category for category in self._listeners if category not in ('box', 'world', 'label')]
+        for w in interpretation.worlds():
+            for category in categories:
+                for fml in sorted(w._formulas[category], key = hash):
+                    self.formula_added(w, category, fml, False)
+            for priority in self._listeners.get('label', ()):
+                for fml in sorted(w._label, key = hash):
+                    self.push(priority, (w, fml))
+            if w._candidates_blocking:
+                self.box_subformula_added(w)   #the blocked formulas of the world are checked again
+        for priority in self._listeners.get('world', ()):
+            self.push(priority, None)
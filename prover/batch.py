@@ -0,0 +1,153 @@
+from tableau import DL_Tableau
+from result import TableauResult
+
+import os
+import pickle
+import time
+import multiprocessing
+from multiprocessing.connection import wait
+
+try:
+    import resource   #not available on Windows - the workers are then never recycled because of their memory
+except ImportError:
+    resource = None
+
+
+def check_many(concepts, tbox = None, workers = None, time_limit = 12, kill_after = 5, max_memory = None, retry_time_limit = None, models = False, **options):
+    """Check the satisfiability of many concepts in a pool of worker processes; a generator that yields the results
+    as soon as they are known, in the order in which the concepts are finished (not in the order of the input).
+
+    Arguments:
+        concepts: a list (or another iterable) of concepts; each of them is given as the argument "concept" of a
+            separate DL_Tableau object (a concept or a list of concepts)
+        tbox: the TBox added to each concept (the argument "TBox" of DL_Tableau)
+        workers: number of worker processes (at least 1); None - the number of CPUs
+        time_limit: the time limit (in seconds) of building each tableau (see DL_Tableau.build_tableau)
+        kill_after: if a worker has not finished a concept "kill_after" seconds after its time limit (e.g. when parsing
+            takes too long), the worker is killed and replaced with a new one, and the concept is a time-out
+        max_memory: the maximal memory (in megabytes) used by a worker; a worker that has used more is replaced with a
+            new one after it finishes its concept. None - the workers are never replaced
+        retry_time_limit: if given, each concept that is a time-out because of its time limit (or whose worker was killed)
+            is checked once more (after the other concepts), with this time limit
+        models: if True, the interpretations built by the tableaux are sent back (the attribute "model" of the results);
+            otherwise it is None, since sending the interpretations between the processes takes time
+        options: other arguments of the function "build_tableau" (e.g. backjumping = True)
+
+    Output: pairs (index, result), where index is the position of the concept in "concepts" and result is the
+        TableauResult returned by build_tableau (for a concept whose worker was killed: (True, None, None, None), with
+        the exceeded budget 'killed'), or the exception raised when the concept was parsed or the tableau was built
+    """
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    elif workers < 1:
+        raise ValueError(f"The number of workers must be at least 1 (or None - the number of CPUs), not {workers!r}")
+
+    context = multiprocessing.get_context()
+
+    #concepts waiting for a worker: (index, concept, time limit, is it a repeated check)
+    waiting = [(index, concept, time_limit, False) for index, concept in enumerate(concepts)]
+    waiting.reverse()   #concepts are taken from the end of the list
+
+    idle = []      #connections to the workers without a concept
+    running = {}   #connections to the workers with a concept: (concept, time at which the worker is killed)
+    processes = {}   #processes of the workers, by their connections
+
+    def start_worker():
+        connection, worker_connection = context.Pipe()
+        process = context.Process(target = _batch_worker, args = (worker_connection, tbox, options, max_memory, models), daemon = True)
+        process.start()
+        worker_connection.close()
+        processes[connection] = process
+        idle.append(connection)
+
+    def stop_worker(connection):
+        processes.pop(connection).terminate()
+        connection.close()
+
+    def finished(concept, result):
+        """Return the pair yielded for a finished concept, or None if it is checked once more with a larger time limit."""
+        index, concept, concept_time_limit, repeated = concept
+        if retry_time_limit is not None and not repeated and isinstance(result, TableauResult) and result.exceeded_budget in ('time', 'killed'):
+            waiting.insert(0, (index, concept, retry_time_limit, True))
+            return None
+        return (index, result)
+
+    try:
+        for i in range(min(workers, len(waiting))):
+            start_worker()
+
+        while waiting or running:
+
+            #give the waiting concepts to the idle workers
+            while waiting and idle:
+                connection = idle.pop()
+                concept = waiting.pop()
+                connection.send(concept[1:3])
+                running[connection] = (concept, time.monotonic() + concept[2] + kill_after)
+
+            ready = wait(list(running), timeout = max(min(deadline for concept, deadline in running.values()) - time.monotonic(), 0))
+
+            for connection in ready:
+                concept, deadline = running.pop(connection)
+                try:
+                    result, recycle = connection.recv()
+                except EOFError: #the worker has died (e.g. it was killed by the system because of its memory)
+                    result, recycle = TableauResult(True, None, None, None, 'killed'), True
+
+                if recycle:
+                    stop_worker(connection)
+                    start_worker()
+                else:
+                    idle.append(connection)
+
+                pair = finished(concept, result)
+                if pair is not None:
+                    yield pair
+
+            #kill the workers that have not finished their concepts in time
+            now = time.monotonic()
+            for connection, (concept, deadline) in list(running.items()):
+                if now > deadline:
+                    del running[connection]
+                    stop_worker(connection)
+                    start_worker()
+                    pair = finished(concept, TableauResult(True, None, None, None, 'killed'))
+                    if pair is not None:
+                        yield pair
+
+    finally:
+        for connection in list(processes):
+            stop_worker(connection)
+
+
+
+def _batch_worker(connection, tbox, options, max_memory, models):
+    """Worker process of the function check_many: checks the concepts received through the connection, one at a time,
+    and sends back the results: (result, should the worker be replaced)."""
+    while True:
+        try:
+            concept, time_limit = connection.recv()
+        except EOFError: #the connection has been closed by the main process
+            return
+
+        try:
+            tab = DL_Tableau(concept = concept, TBox = tbox)
+            result = tab.build_tableau(time_limit = time_limit, **options)
+            if models:
+                tab.interpretation.set_agenda(None)
+            else:
+                result.model = None
+        except Exception as error:
+            result = error
+            try:
+                pickle.loads(pickle.dumps(error))
+            except Exception: #the exception (e.g. an error of the parser) cannot be sent to the main process
+                result = RuntimeError(f"{type(error).__name__}: {error}")
+
+        #the peak memory of the process (in kilobytes on Linux)
+        recycle = max_memory is not None and resource is not None and resource.getrusage(resource.RUSAGE_SELF).ru_maxrss > max_memory * 1024
+
+        connection.send((result, recycle))
+        if recycle:
+            return
@@ -1,4 +1,8 @@
 from lark import Lark, Transformer
+import weakref
+import zlib
+from itertools import count
+from functools import lru_cache
 
 
 #####################################
@@ -10,16 +14,18 @@ from lark import Lark, Transformer
 Basic grammer for the language of the logic ALCi. 
 Note that the grammar accepts two symbols for all the connectives - apart from descriptions:
 & and Π for conjunction, ~ and ¬ for negation, etc.
+
+The grammar is LALR(1), so the parser is a fast LALR parser (instead of the default Earley parser of Lark), and the 
+transformer "ToFml" is built into it: the Formula objects (as defined below) are created during parsing, without 
+building a parse tree first. Hence parser_DL.parse returns a Formula object, e.g. parser_DL.parse('A & ~B').
+Conjunctions and subsumptions are left-associative and bind weaker than the other connectives, e.g. 'A & B -> ~C' 
+is parsed as '(A & B) -> (~C)'. The script "benchmark_parsing.py" (in the folder "experiments") compares this parser 
+with the Earley parser for the same grammar.
 """
 
-parser_DL = Lark(r"""
+grammar_DL = r"""
 ?fml: conjunction
     | conditional
-    | description_global
-    | description_local
-    | negation
-    | diamond
-    | atom
     | _subfml
 
 ATOM : /[A-Z]\w*/
@@ -27,23 +33,21 @@ ROLE : /[a-z]\w*/
 
 atom : ATOM
 negation : ("~" | "¬") _subfml
-conjunction : (conjunction | conditional | _subfml) ("&" | "Π") _subfml
-conditional : (conjunction | conditional | _subfml) ("->" | "-:") _subfml
+conjunction : fml ("&" | "Π") _subfml
+conditional : fml ("->" | "-:") _subfml
 description_global : "i" _subfml "." _subfml
 description_local : "i" "." _subfml
 diamond : ("Ǝ" | "*E") ROLE _subfml
 
-_unary : negation | diamond | description_local
-_subfml : "(" fml ")" | _unary | atom | description_global | description_local
+_subfml : "(" fml ")" | negation | diamond | description_local | description_global | atom
 
 %import common.WS
 %ignore WS
-""", start = "fml")
+"""
 
 
-''
 class ToFml(Transformer):
-    """ Transformer class, required by the Lark library to transform a tree object initially built by the parser into a proper Formula object (as defined below)"""
+    """ Transformer class, required by the Lark library to transform the rules of the grammar into proper Formula objects (as defined below); it is built into the parser "parser_DL" """
     
     def atom(self, v):
         return Atom(*v)
@@ -67,6 +71,40 @@ class ToFml(Transformer):
         return Description_Global(*v)
 
 
+parser_DL = Lark(grammar_DL, start = "fml", parser = "lalr", transformer = ToFml())
+
+
+
+"""
+Parse cache: the same concepts, ABox and TBox strings are often parsed many times (e.g. when many queries are asked 
+against the same TBox), so the function "parse" keeps the formulas of the most recently parsed strings (at most 
+PARSE_CACHE_SIZE of them). The strings are normalized first (runs of white spaces are replaced with a single space), 
+and the formulas are shared - they are interned and never modified, so the same object can be returned every time.
+"""
+
+PARSE_CACHE_SIZE = 4096   #maximal number of strings in the parse cache
+
+
+@lru_cache(maxsize = PARSE_CACHE_SIZE)
+def _parse_normalized(string: str):
+    return parser_DL.parse(string)
+
+
+def parse(string: str):
+    """ Returns the formula parsed from the string, taken from the parse cache if the string was parsed before."""
+    return _parse_normalized(" ".join(string.split()))
+
+
+def parse_cache_info():
+    """ Returns the statistics of the parse cache: the numbers of hits and misses, the maximal and the current size."""
+    return _parse_normalized.cache_info()
+
+
+def parse_cache_clear():
+    """ Removes all formulas from the parse cache (and resets its statistics)."""
+    _parse_normalized.cache_clear()
+
+
 
 
 ###############################
@@ -74,46 +112,169 @@ class ToFml(Transformer):
 #################################
 
 
-class Formula():
+"""
+Formulas are hash-consed: every call of a formula constructor (e.g. Negation(A)) goes through the interning factory 
+below, which returns the already existing object if a structurally identical formula has been built before. Each 
+distinct subformula therefore exists only once, gets a unique id ("uid") and a precomputed hash, and two formulas 
+are equal if and only if they are the same object. Note that operands are interned in the given order, so C Π D and 
+D Π C are two different formulas (in accordance with the hashes used for them so far).
+"""
+
+_formula_table = weakref.WeakValueDictionary()   #interning table: structural key -> the unique formula object with that structure
+_formula_uids = count()   #counter of unique formula ids
+
+
+class FormulaFactory(type):
+    """ Metaclass of all formula classes, turning their constructors into an interning factory"""
+
+    def __call__(cls, *args):
+        key = cls._intern_key(*args)
+        fml = _formula_table.get(key)
+        if fml is None:
+            fml = super().__call__(*args)
+            fml.uid = next(_formula_uids)
+            fml._hash = fml._structural_hash()
+            _formula_table[key] = fml
+        return fml
+
+
+def _string_hash(string: str) -> int:
+    """ Deterministic hash of a string (unlike hash(), it does not depend on the Python process)"""
+    return zlib.crc32(string.encode())
+
+
+
+"""
+Symbol table: the names of atoms and roles are interned as well - each distinct name is given a small integer (its 
+symbol), in the order in which the names are first used. Atoms and diamonds are interned by the symbols of their names, 
+the deterministic hash of a name is computed only once, and all formulas with the same name share one string object 
+(so comparing the names, e.g. the roles of two diamonds, is a comparison of identical objects). Note that the symbols 
+depend on the order in which the names appear in the process, so the hashes of formulas are still computed from the 
+names themselves.
+"""
+
+_symbols = {}         #symbol table: name of an atom or a role -> its symbol
+_symbol_names = []    #names of the symbols (the shared string objects), indexed by the symbols
+_symbol_hashes = []   #deterministic hashes of the names of the symbols (see _string_hash), indexed by the symbols
+
+
+def symbol(name: str) -> int:
+    """ Returns the symbol of the name of an atom or a role (a new symbol, if the name is used for the first time)."""
+    sym = _symbols.get(name)
+    if sym is None:
+        name = str(name)   #the name may be a token of the parser (a subclass of str)
+        sym = _symbols[name] = len(_symbol_names)
+        _symbol_names.append(name)
+        _symbol_hashes.append(_string_hash(name))
+    return sym
+
+
+def symbol_name(sym: int) -> str:
+    """ Returns the name of the atom or the role with the given symbol."""
+    return _symbol_names[sym]
+
+
+
+class Formula(metaclass = FormulaFactory):
     """Main formula class"""
     
     
+    @property
+    def atoms(self):
+        """ Returns the dictionary with the atoms present in any formula as keys, and lists of their occurrences as values."""
+        return {atom_string: [Atom(atom_string)] * occurrences for atom_string, occurrences in self.atom_occurrences.items()}
+
     @property
     def atom_symbols(self):
         """ Returns the list of atoms present in any formula."""
-        return list(self.atoms.keys())
+        return list(self.atom_occurrences)
 
     def transform(self, transformer):
         """ Technical function needed by the Lark library for parsing."""
         return transformer(self)
 
+    @property
+    def metrics(self):
+        """ Returns the structural properties of the formula (see the class Metrics), computed once and stored in the formula."""
+        try:
+            return self._metrics
+        except AttributeError:
+            pass
+
+        #a single bottom-up pass over the subformulas whose metrics are not known yet (without recursion, since formulas may be deep)
+        stack = [self]
+        while stack:
+            fml = stack[-1]
+            missing = [sub for sub in fml._subformulas() if not hasattr(sub, '_metrics')]
+            if missing:
+                stack.extend(missing)
+            else:
+                fml._metrics = fml._compute_metrics(*[sub._metrics for sub in fml._subformulas()])
+                stack.pop()
+        return self._metrics
+
+    @property
+    def atom_occurrences(self) -> dict:
+        """ Returns the dictionary with the atoms (strings) present in the formula as keys, and the numbers of their 
+        occurrences as values, in the order of first occurrences (computed once and stored in the formula)."""
+        try:
+            return self._atom_occurrences
+        except AttributeError:
+            pass
+
+        #a single depth-first pass over the distinct subformulas (without recursion, since formulas may be deep): the order 
+        #of entering them is the order of their first occurrences, and the reversed order of leaving them puts each 
+        #subformula after all the subformulas containing it
+        entered, left = [], []
+        visited = set()
+        stack = [(self, False)]
+        while stack:
+            fml, leaving = stack.pop()
+            if leaving:
+                left.append(fml)
+            elif fml not in visited:
+                visited.add(fml)
+                entered.append(fml)
+                stack.append((fml, True))
+                stack.extend((sub, False) for sub in reversed(fml._subformulas()))
+
+        #the number of occurrences of each subformula is the sum of the numbers of occurrences of the formulas containing it
+        occurrences = dict.fromkeys(left, 0)
+        occurrences[self] = 1
+        for fml in reversed(left):
+            for sub in fml._subformulas():
+                occurrences[sub] += occurrences[fml]
+
+        self._atom_occurrences = {fml.atom_string: occurrences[fml] for fml in entered if isinstance(fml, Atom)}
+        return self._atom_occurrences
+
     def binary_count(self) -> int:
-        """ Returns the number of binary connectives (excluding global descriptions) present in any formula (defined separately for each formula subclass)."""
-        pass
+        """ Returns the number of binary connectives (excluding global descriptions) present in any formula."""
+        return self.metrics.binary_count
 
     def binary_descr_global_count(self) -> int:
         """ Returns the number of all binary connectives in any formula (defined separately for each formula subclass)."""
         return self.binary_count() + self.descr_global_count()
 
     def descr_global_count(self) -> int:
-        """ Returns the number of global descriptions present in any formula (defined separately for each formula subclass)."""
-        pass
+        """ Returns the number of global descriptions present in any formula."""
+        return self.metrics.descr_global_count
 
     def descr_local_count(self) -> int:
-        """ Returns the number of local descriptions present in any formula (defined separately for each formula subclass)."""
-        pass
+        """ Returns the number of local descriptions present in any formula."""
+        return self.metrics.descr_local_count
 
     def descr_global_local_count(self) -> int:
         """ Returns the number of descriptions present in any formula."""
         return self.descr_local_count() + self.descr_global_count()
 
     def modal_count(self) -> int:
-        """ Returns the number of modalities present in any formula (defined separately for each formula subclass)."""
-        pass
+        """ Returns the number of modalities present in any formula."""
+        return self.metrics.modal_count
 
     def modal_degree(self) -> int:
-        """ Returns the modal degree (or modal depth) of any formula (defined separately for each formula subclass)."""
-        pass
+        """ Returns the modal degree (or modal depth) of any formula."""
+        return self.metrics.modal_degree
 
     def occur_var_count(self) -> int:
         """ Returns the number of occurrences of atoms in any formula."""
@@ -121,7 +282,15 @@ class Formula():
     
     def var_count(self) -> int:
         """ Returns the number of different atoms present in any formula."""
-        return len(self.atom_symbols)
+        return len(self.atom_occurrences)
+
+    def _subformulas(self) -> tuple:
+        """ Returns the immediate subformulas of the formula (defined separately for each formula subclass)."""
+        pass
+
+    def _compute_metrics(self, *sub_metrics):
+        """ Returns the metrics of the formula, computed from the metrics of its immediate subformulas (defined separately for each formula subclass)."""
+        pass
 
 
 
@@ -143,7 +312,56 @@ class Formula():
     #FUNCTIONS FOR EQUALITY
     
     def __eq__(self,other):
-        """ Function necessary to implement equality of formulas."""
+        """ Formulas are interned, hence equality of formulas is identity of objects."""
+        return self is other
+
+    def __hash__(self):
+        """ Returns the hash computed once, when the formula was created."""
+        return self._hash
+
+    def __reduce__(self):
+        """ Pickling support - unpickled formulas are interned again in the target process."""
+        return (type(self), self._constructor_args())
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+
+    #FUNCTIONS FOR COMPLEMENTS (used by the tableau rules to check in one lookup, whether the opposite formula is present in a world)
+
+    @property
+    def negation(self):
+        """ Returns the negation of the formula (built once, and then stored in the formula)."""
+        try:
+            return self._negation
+        except AttributeError:
+            self._negation = Negation(self)
+            return self._negation
+
+    @property
+    def complement(self):
+        """ Returns the formula contradicting this formula: its negation, or - for a negation ~A - the formula A."""
+        return self.negation
+
+
+
+    #FUNCTIONS FOR INTERNING (defined separately for each formula subclass)
+
+    @classmethod
+    def _intern_key(cls, *args) -> tuple:
+        """ Returns the key identifying the structure of a formula built from the constructor arguments."""
+        pass
+
+    def _constructor_args(self) -> tuple:
+        """ Returns the arguments needed to build the formula again."""
+        pass
+
+    def _structural_hash(self) -> int:
+        """ Returns the hash of the formula computed from its structure."""
         pass
 
 
@@ -152,14 +370,11 @@ class Formula():
 
 class Atom(Formula):
     """Class for atomic formulas"""
+    tag = 1   #used for computing the hash
 
     def __init__(self, atom_string: str):
-        self.atom_string = atom_string
-
-    @property
-    def atoms(self):
-        return {str(self.atom_string): [self]}
-
+        self.symbol = symbol(atom_string)   #attribute for the symbol of the name of the atom (see the symbol table)
+        self.atom_string = _symbol_names[self.symbol]
 
     #FUNCTIONS RELATED TO FORMULA REPRESENTATION
 
@@ -173,31 +388,26 @@ class Atom(Formula):
         return f"Atom[{self.atom_string}]"
 
 
-    #FUNCTIONS FOR EQUALITY
-    
-    def __eq__(self,other):
-        return ((self.atom_string == other.atom_string) if isinstance(other, Atom) else False) 
-
-    def __hash__(self):
-        return hash(self.atom_string)
+    #FUNCTIONS FOR INTERNING
 
+    @classmethod
+    def _intern_key(cls, atom_string):
+        return (cls, symbol(atom_string))
 
-    #FUNCTIONS  REFLECTING STRUCTURAL PROPERTIES
+    def _constructor_args(self):
+        return (self.atom_string,)
 
-    def binary_count(self) -> int:
-        return 0
+    def _structural_hash(self):
+        return hash((self.tag, _symbol_hashes[self.symbol]))
 
-    def descr_global_count(self) -> int:
-        return 0
 
-    def descr_local_count(self) -> int:
-        return 0
+    #FUNCTIONS  REFLECTING STRUCTURAL PROPERTIES
 
-    def modal_count(self) -> int:
-        return 0
+    def _subformulas(self):
+        return ()
 
-    def modal_degree(self) -> int:
-        return 0
+    def _compute_metrics(self):
+        return Metrics(0, 0, 0, 0, 0)
 
 
 
@@ -210,10 +420,6 @@ class Unary(Formula):
     def __init__(self, sub: Formula):
         self.sub = sub   #attribute for the subformula
 
-    @property
-    def atoms(self):
-        return self.sub.atoms
-
 
 
     #FUNCTIONS RELATED TO FORMULA REPRESENTATION
@@ -233,19 +439,24 @@ class Unary(Formula):
 
 
 
-    #FUNCTIONS REFLECTING STRUCTURAL PROPERTIES
+    #FUNCTIONS FOR INTERNING
 
-    def binary_count(self) -> int:
-        return self.sub.binary_count()
+    @classmethod
+    def _intern_key(cls, sub):
+        return (cls, sub.uid)
 
-    def descr_global_count(self) -> int:
-        return self.sub.descr_global_count()
+    def _constructor_args(self):
+        return (self.sub,)
 
-    def modal_count(self) -> int:
-        return self.sub.modal_count()
+    def _structural_hash(self):
+        return hash((self.tag, self.sub._hash))
 
-    def modal_degree(self) -> int:
-        return self.sub.modal_degree()
+
+
+    #FUNCTIONS REFLECTING STRUCTURAL PROPERTIES
+
+    def _subformulas(self):
+        return (self.sub,)
 
 
 
@@ -255,21 +466,17 @@ class Negation(Unary):
     """Class for negations"""
     signature = "Neg"   #used for the "__repr__" function
     connective = "¬"    #used for "__str__" and "formula_string" functions
+    tag = 2             #used for computing the hash
 
-
-    #FUNCTIONS FOR EQUALITY
-    
-    def __eq__(self,other):
-        return ((self.sub == other.sub) if isinstance(other, Negation) else False) 
-
-    def __hash__(self):
-        return hash(self.sub)
+    @property
+    def complement(self):
+        return self.sub
 
 
     #FUNCTIONS REFLECTING STRUCTURAL PROPERTIES
 
-    def descr_local_count(self) -> int:
-        return self.sub.descr_local_count()
+    def _compute_metrics(self, sub_metrics):
+        return sub_metrics   #a negation has the same structural properties as its subformula (the metrics are never modified)
 
 
 
@@ -279,20 +486,13 @@ class Description_Local(Unary):
     """Class for local definite descriptions"""
     signature = "Desc_Loc"   #used for the "__repr__" function
     connective = "i."     #used for "__str__" and "formula_string" functions
-
-    #FUNCTIONS FOR EQUALITY
-    
-    def __eq__(self,other):
-        return ((self.sub == other.sub) if isinstance(other, Description_Local) else False) 
-
-    def __hash__(self):
-        return hash(self.sub)
+    tag = 3               #used for computing the hash
 
 
     #FUNCTIONS REFLECTING STRUCTURAL PROPERTIES
 
-    def descr_local_count(self) -> int:
-        return self.sub.descr_local_count() + 1
+    def _compute_metrics(self, sub_metrics):
+        return sub_metrics.add(descr_local_count = 1)
 
 
 
@@ -302,17 +502,14 @@ class Diamond(Formula):
     """ Class for modal formulas of the form "Ǝ modality_type Formula" """
     signature = "Diamond"  #used for the "__repr__" function
     connective = "Ǝ "  #used for "__str__" and "formula_string" functions
+    tag = 4            #used for computing the hash
 
     def __init__(self, sub1, sub2: Formula):
-       self.role = str(sub1)  #attribute for the modality type (role - in the jargon of description logic)
+       self.role_symbol = symbol(sub1)   #attribute for the symbol of the role (see the symbol table)
+       self.role = _symbol_names[self.role_symbol]  #attribute for the modality type (role - in the jargon of description logic)
        self.sub2 = sub2       #attribute for the subformula
 
 
-    @property
-    def atoms(self):
-        return self.sub2.atoms
-
-
 
     #FUNCTIONS RELATED TO FORMULA REPRESENTATION
 
@@ -336,32 +533,27 @@ class Diamond(Formula):
 
 
 
-    #FUNCTIONS FOR EQUALITY
-    
-    def __eq__(self,other):
-        return ((self.role == other.role and self.sub2 == other.sub2) if isinstance(other, Diamond) else False) 
-
-    def __hash__(self):
-        return hash((self.role, self.sub2))
+    #FUNCTIONS FOR INTERNING
 
+    @classmethod
+    def _intern_key(cls, sub1, sub2):
+        return (cls, symbol(sub1), sub2.uid)
 
+    def _constructor_args(self):
+        return (self.role, self.sub2)
 
-    #FUNCTIONS REFLECTING STRUCTURAL PROPERTIES
+    def _structural_hash(self):
+        return hash((self.tag, _symbol_hashes[self.role_symbol], self.sub2._hash))
 
-    def binary_count(self) -> int:
-        return self.sub2.binary_count()
 
-    def descr_global_count(self) -> int:
-        return self.sub2.descr_global_count()
 
-    def descr_local_count(self) -> int:
-        return self.sub2.descr_local_count()
+    #FUNCTIONS REFLECTING STRUCTURAL PROPERTIES
 
-    def modal_count(self) -> int:
-        return self.sub2.modal_count() + 1
+    def _subformulas(self):
+        return (self.sub2,)
 
-    def modal_degree(self) -> int:
-        return self.sub2.modal_degree() + 1
+    def _compute_metrics(self, sub_metrics):
+        return sub_metrics.add(modal_count = 1, modal_degree = 1)
 
 
 
@@ -375,14 +567,6 @@ class Binary(Formula):
     def __init__(self):
         pass
 
-    @property
-    def atoms(self):
-        atoms = dict()
-        for subfml in self.subs:
-            for k, v in subfml.atoms.items():
-                atoms[k] = atoms.get(k, []) + v
-        return atoms
-
 
 
     #FUNCTIONS RELATED TO FORMULA REPRESENTATION
@@ -409,22 +593,26 @@ class Binary(Formula):
         )
 
 
-    #FUNCTIONS REFLECTING STRUCTURAL PROPERTIES
+    #FUNCTIONS FOR INTERNING
 
-    def binary_count(self) -> int:
-        return self.subs[0].binary_count() + self.subs[1].binary_count() + 1
+    @classmethod
+    def _intern_key(cls, sub1, sub2):
+        return (cls, sub1.uid, sub2.uid)
 
-    def descr_global_count(self) -> int:
-        return self.subs[0].descr_global_count() + self.subs[1].descr_global_count()
+    def _constructor_args(self):
+        return self.subs
 
-    def descr_local_count(self) -> int:
-        return self.subs[0].descr_local_count() + self.subs[1].descr_local_count()
+    def _structural_hash(self):
+        return hash((self.tag, self.subs[0]._hash, self.subs[1]._hash))
 
-    def modal_count(self) -> int:
-        return self.subs[0].modal_count() + self.subs[1].modal_count()
 
-    def modal_degree(self) -> int:
-        return max(self.subs[0].modal_degree(), self.subs[1].modal_degree())
+    #FUNCTIONS REFLECTING STRUCTURAL PROPERTIES
+
+    def _subformulas(self):
+        return self.subs
+
+    def _compute_metrics(self, sub_metrics1, sub_metrics2):
+        return Metrics.merge(sub_metrics1, sub_metrics2).add(binary_count = 1)
 
 
 
@@ -434,20 +622,12 @@ class Conjunction(Binary):
     """ Class for Conjunctions """
     signature = "Conj"   #used for the "__repr__" function
     connective = "Π"    #used for "__str__" and "formula_string" functions
+    tag = 5             #used for computing the hash
 
     def __init__(self, sub1: Formula, sub2: Formula):
         self.subs = (sub1, sub2)
 
 
-    #FUNCTIONS FOR EQUALITY
-    
-    def __eq__(self,other):
-        return ((self.subs[0] == other.subs[0] and self.subs[1] == other.subs[1]) or (self.subs[0] == other.subs[1] and self.subs[1] == other.subs[0]) if isinstance(other, Conjunction) else False)
-
-    def __hash__(self):
-        return hash(self.subs)
-
-
 
 
 #CONDITIONAL----------------------------------
@@ -457,20 +637,12 @@ class Conditional(Binary):
     """ Class for Conditionals """
     signature = "Cond"   #used for the "__repr__" function
     connective = "→"     #used for "__str__" and "formula_string" functions
+    tag = 6              #used for computing the hash
 
     def __init__(self, sub1: Formula, sub2: Formula):
         self.subs = (sub1, sub2)
 
 
-    #FUNCTIONS FOR EQUALITY
-    
-    def __eq__(self,other):
-        return (self.subs[0] == other.subs[0] and self.subs[1] == other.subs[1] if isinstance(other, Conditional) else False)
-
-    def __hash__(self):
-        return hash(self.subs)
-
-
 
 #GLOBAL DEFINITE DESCRIPTION------------------------
 
@@ -479,6 +651,7 @@ class Description_Global(Binary):
     """ Class for Global descriptions """
     signature = "Desc_Glob"   #used for the "__repr__" function
     connective = "i "         #used for "__str__" and "formula_string" functions
+    tag = 7                   #used for computing the hash
 
     def __init__(self, sub1: Formula, sub2: Formula):
         self.subs = (sub1, sub2)
@@ -516,28 +689,38 @@ class Description_Global(Binary):
 
 
 
-    #FUNCTIONS FOR EQUALITY
-
-    def __eq__(self,other):
-        return(self.subs[0] == other.subs[0] and self.subs[1] == other.subs[1] if isinstance(other, Description_Global) else False)
-
-    def __hash__(self):
-        return hash(self.subs)
-
-
-
     #FUNCTIONS REFLECTING STRUCTURAL PROPERTIES
 
-    def binary_count(self) -> int:
-        return self.subs[0].binary_count() + self.subs[1].binary_count()
-
-    def descr_global_count(self) -> int:
-        return self.subs[0].descr_global_count() + self.subs[1].descr_global_count() + 1
-
+    def _compute_metrics(self, sub_metrics1, sub_metrics2):
+        return Metrics.merge(sub_metrics1, sub_metrics2).add(descr_global_count = 1)
 
 
 
+#METRICS ---------------------------------------------
 
+class Metrics:
+    """ Class for the structural properties of a formula (see the functions binary_count, modal_degree, etc. of the class 
+    Formula), computed in a single bottom-up pass from the metrics of the subformulas, and stored in the (interned) 
+    formula, so that each of the functions is answered without traversing the formula. Metrics are never modified 
+    after they are stored, so they may be shared by formulas (e.g. by a negation and its subformula). The occurrences 
+    of atoms are not part of the metrics - merging them at every binary node would copy them (see Formula.atom_occurrences)."""
+    __slots__ = 'binary_count', 'descr_global_count', 'descr_local_count', 'modal_count', 'modal_degree'
 
+    def __init__(self, binary_count: int, descr_global_count: int, descr_local_count: int, modal_count: int, modal_degree: int):
+        self.binary_count = binary_count
+        self.descr_global_count = descr_global_count
+        self.descr_local_count = descr_local_count
+        self.modal_count = modal_count
+        self.modal_degree = modal_degree
 
+    def add(self, binary_count = 0, descr_global_count = 0, descr_local_count = 0, modal_count = 0, modal_degree = 0):
+        """ Returns new metrics with the given numbers added."""
+        return Metrics(self.binary_count + binary_count, self.descr_global_count + descr_global_count, self.descr_local_count + descr_local_count, 
+                       self.modal_count + modal_count, self.modal_degree + modal_degree)
 
+    @staticmethod
+    def merge(metrics1, metrics2):
+        """ Returns the metrics of two subformulas together (the modal degree is the greater of the two)."""
+        return Metrics(metrics1.binary_count + metrics2.binary_count, metrics1.descr_global_count + metrics2.descr_global_count, 
+                       metrics1.descr_local_count + metrics2.descr_local_count, metrics1.modal_count + metrics2.modal_count, 
+                       max(metrics1.modal_degree, metrics2.modal_degree))
@@ -0,0 +1,180 @@
+import forms
+
+import os
+import json
+import numpy as np
+
+
+"""
+Compact representation of a corpus of formulas (e.g. all concepts of a dataset): instead of a tree of Python objects
+for each formula, all the formulas are stored in one table of nodes, kept in NumPy arrays. Each distinct subformula
+is a single node (formulas are hash-consed, so subformulas shared by formulas of the corpus are stored once), and
+the nodes are ordered so that the subformulas of a node always precede it. The table can be saved to a folder of
+binary files and loaded from it as memory-mapped arrays, without parsing the formulas again.
+"""
+
+#formula classes by their opcodes in the table (the opcode of a class is its tag, used for computing the hash)
+CLASSES = {cls.tag: cls for cls in (forms.Atom, forms.Negation, forms.Description_Local, forms.Diamond, forms.Conjunction, forms.Conditional, forms.Description_Global)}
+
+#names of the arrays of the table (each of them is saved in a separate file)
+ARRAYS = ('opcode', 'child1', 'child2', 'role', 'atom', 'height', 'roots')
+
+
+class FormulaTable:
+    """Class for a table of formulas, with the following arrays (one element for each node, except for "roots"):
+        opcode: the class of the formula of the node (see CLASSES)
+        child1, child2: the nodes of the subformulas (-1 if there is no such subformula); for a diamond, child1 is the
+            subformula and child2 is -1
+        role: the index of the role (in the list "roles") of a diamond, -1 for other nodes
+        atom: the index of the atom (in the list "atoms") of an atom, -1 for other nodes
+        height: the height of the node in the syntax tree (0 for atoms)
+        roots: the nodes of the formulas of the corpus, in the order of the corpus
+    and the lists "atoms" and "roles" of the names of atoms and roles.
+    """
+
+    def __init__(self, arrays: dict, atoms: list, roles: list):
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+        self.atoms = atoms
+        self.roles = roles
+
+    def __len__(self):
+        """Return the number of formulas in the corpus."""
+        return len(self.roots)
+
+    def __getitem__(self, i: int):
+        """Return the i-th formula of the corpus, as a Formula object."""
+        return self.node_formula(int(self.roots[i]))
+
+
+    @classmethod
+    def from_formulas(cls, formulas):
+        """Build the table of the formulas (an iterable of Formula objects)."""
+        columns = {name: [] for name in ARRAYS}
+        atoms, roles = {}, {}   #indices of the names of atoms and roles
+        nodes = {}   #nodes of the formulas already in the table, by their unique ids
+
+        for formula in formulas:
+            #post-order traversal of the subformulas not yet in the table (without recursion, since formulas may be deep)
+            stack = [formula]
+            while stack:
+                fml = stack[-1]
+                if fml.uid in nodes:
+                    stack.pop()
+                    continue
+                missing = [sub for sub in fml._subformulas() if sub.uid not in nodes]
+                if missing:
+                    stack.extend(reversed(missing))
+                    continue
+                stack.pop()
+
+                children = [nodes[sub.uid] for sub in fml._subformulas()] + [-1, -1]
+                columns['opcode'].append(fml.tag)
+                columns['child1'].append(children[0])
+                columns['child2'].append(children[1])
+                columns['role'].append(roles.setdefault(fml.role, len(roles)) if isinstance(fml, forms.Diamond) else -1)
+                columns['atom'].append(atoms.setdefault(fml.atom_string, len(atoms)) if isinstance(fml, forms.Atom) else -1)
+                columns['height'].append(max((columns['height'][child] + 1 for child in children if child >= 0), default = 0))
+                nodes[fml.uid] = len(nodes)
+
+            columns['roots'].append(nodes[formula.uid])
+
+        arrays = {name: np.array(columns[name], dtype = np.uint8 if name == 'opcode' else np.int32) for name in ARRAYS}
+        return cls(arrays, list(atoms), list(roles))
+
+
+    def node_formula(self, node: int):
+        """Return the formula of the node, as a Formula object."""
+        built = {}   #formulas of the nodes already built
+        stack = [node]
+        while stack:
+            n = stack[-1]
+            if n in built:
+                stack.pop()
+                continue
+            children = [int(child) for child in (self.child1[n], self.child2[n]) if child >= 0]
+            missing = [child for child in children if child not in built]
+            if missing:
+                stack.extend(missing)
+                continue
+            stack.pop()
+
+            opcode = int(self.opcode[n])
+            if opcode == forms.Atom.tag:
+                built[n] = forms.Atom(self.atoms[self.atom[n]])
+            elif opcode == forms.Diamond.tag:
+                built[n] = forms.Diamond(self.roles[self.role[n]], built[children[0]])
+            else:
+                built[n] = CLASSES[opcode](*[built[child] for child in children])
+        return built[node]
+
+    def formulas(self):
+        """Return the list of all formulas of the corpus, as Formula objects (each node is built only once)."""
+        built = []
+        for n in range(len(self.opcode)):
+            opcode = int(self.opcode[n])
+            if opcode == forms.Atom.tag:
+                built.append(forms.Atom(self.atoms[self.atom[n]]))
+            elif opcode == forms.Diamond.tag:
+                built.append(forms.Diamond(self.roles[self.role[n]], built[self.child1[n]]))
+            elif self.child2[n] < 0:
+                built.append(CLASSES[opcode](built[self.child1[n]]))
+            else:
+                built.append(CLASSES[opcode](built[self.child1[n]], built[self.child2[n]]))
+        return [built[root] for root in self.roots]
+
+
+    def save(self, path: str):
+        """Save the table to the folder "path" (created if it does not exist): one binary .npy file for each array,
+        and the names of atoms and roles in the file "symbols.json"."""
+        os.makedirs(path, exist_ok = True)
+        for name in ARRAYS:
+            np.save(os.path.join(path, name + '.npy'), getattr(self, name))
+        with open(os.path.join(path, 'symbols.json'), 'w', encoding = 'utf-8') as file:
+            json.dump({'atoms': self.atoms, 'roles': self.roles}, file)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True):
+        """Load the table saved in the folder "path"; if mmap is True, the arrays are memory-mapped (read-only),
+        i.e. they are read from the files only when they are used."""
+        arrays = {name: np.load(os.path.join(path, name + '.npy'), mmap_mode = 'r' if mmap else None) for name in ARRAYS}
+        with open(os.path.join(path, 'symbols.json'), encoding = 'utf-8') as file:
+            symbols = json.load(file)
+        return cls(arrays, symbols['atoms'], symbols['roles'])
+
+
+    def metrics(self):
+        """Return a dictionary of arrays with the structural properties of the formulas of the corpus (in the order of
+        the corpus): binary_count, descr_global_count, descr_local_count, modal_count and modal_degree (see the
+        corresponding functions of the class Formula).
+
+        The properties are computed for all nodes at once, with vectorized operations on the arrays, level by level:
+        the nodes of the same height depend only on the nodes of smaller heights.
+        """
+        n = len(self.opcode)
+        opcode = np.asarray(self.opcode)
+        #the missing children point to an additional node (with index n), whose properties are 0
+        child1 = np.where(np.asarray(self.child1) >= 0, self.child1, n)
+        child2 = np.where(np.asarray(self.child2) >= 0, self.child2, n)
+        height = np.asarray(self.height)
+
+        own = {'binary_count': (opcode == forms.Conjunction.tag) | (opcode == forms.Conditional.tag),
+               'descr_global_count': opcode == forms.Description_Global.tag,
+               'descr_local_count': opcode == forms.Description_Local.tag,
+               'modal_count': opcode == forms.Diamond.tag,
+               'modal_degree': opcode == forms.Diamond.tag}
+        values = {name: np.zeros(n + 1, dtype = np.int64) for name in own}
+
+        order = np.argsort(height, kind = 'stable')
+        bounds = np.searchsorted(height[order], np.arange(height.max() + 2 if n else 1))
+        for level in range(len(bounds) - 1):
+            nodes = order[bounds[level]:bounds[level + 1]]
+            c1, c2 = child1[nodes], child2[nodes]
+            for name, array in values.items():
+                if name == 'modal_degree':
+                    array[nodes] = own[name][nodes] + np.maximum(array[c1], array[c2])
+                else:
+                    array[nodes] = own[name][nodes] + array[c1] + array[c2]
+
+        roots = np.asarray(self.roots)
+        return {name: array[roots] for name, array in values.items()}
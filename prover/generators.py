@@ -1,7 +1,8 @@
 #1. World names generator -------------
 
 """
-The three functions below, combined, generate new world names, making sure that the new name has not been used so far
+The generator below gives the names of the worlds created by the tableau, which are named only when the interpretation 
+is printed (see Interpretation.world_names, which skips the names that have been used in the input)
 """
 
 #generator
@@ -14,66 +15,15 @@ def world_names():
         n += 1 
 
 
-# Function that uses the generator
-def get_next_world_name(world_names):
-    return next(world_names)
-
-
-
-def new_world_name(interpretation):
-    """ outputs a new world name, checking if it has not been used so far"""
-    worlds_counter = world_names()
-    
-    x = get_next_world_name(worlds_counter)
-    while True:
-        if x in interpretation._world_names_str:
-            x = get_next_world_name(worlds_counter)
-        else:
-            break
-    
-    interpretation._world_names_str.update({x})
-    return(x)
-
-
 
 
 #2. Fresh atoms generator -------------
 
 """
-The three functions below, combined, generate new atom names, making sure that the new name has not been used so far
+The function below gives the names of fresh atoms, which are numbered by a counter of the interpretation (see 
+Interpretation.new_fresh_atom), so a new name is found without checking all the names used so far
 """
 
-
-
-#generator
-def fresh_atom_names():
-    """ a generator of atom names of the form Fresh_Atom_1, Fresh_Atom_2, Fresh_Atom_3,... """
-    a = 'Fresh_Atom_'
-    n = 1
-    while True:
-        yield a + str(n)
-        n += 1 
-
-
-# Function that uses the generator
-def get_next_fresh_atom(fresh_atom_names):
-    return next(fresh_atom_names)
-
-
-
-def new_fresh_atom(interpretation):
-    """ outputs a new atom name, checking if it has not been used so far"""
-    fresh_atoms_counter = fresh_atom_names()
-    
-    x = get_next_fresh_atom(fresh_atoms_counter)
-
-    while True:
-        if x in interpretation._all_atoms_in_interpretation:
-            x = get_next_fresh_atom(fresh_atoms_counter)
-        else:
-            break
-    
-    interpretation._all_atoms_in_interpretation.update({x})
-    return(x)
-        
-
+def fresh_atom_name(n: int):
+    """ outputs the name of the n-th fresh atom: Fresh_Atom_1, Fresh_Atom_2, Fresh_Atom_3,... """
+    return 'Fresh_Atom_' + str(n)
@@ -0,0 +1,44 @@
+"""
+Branching heuristics of the tableau: they decide which premise of a branching rule (a negated conjunction, a negated
+global description or a negated local description) is branched on next. The tasks of the branching rules waiting in the
+agenda (see the script "agenda") are compared by their keys - the task with the smallest key is taken first, and tasks
+with equal keys are taken in the order in which they were added to the agenda.
+
+Each heuristic is a function of the interpretation and a task (world, formula), which returns the key of the task:
+    oldest - the premise that was added first is taken first (the tasks are taken in the order of the agenda)
+    smallest - the premise with the smallest size (number of atoms, connectives, roles and descriptions) is taken first
+    moms - frequency scoring in the style of MOMS / Jeroslow-Wang: each pending premise of a world is a clause (e.g.
+        ~(C & D) is the clause ~C v ~D), and the premise whose literals occur in the largest number of pending clauses of
+        the world is taken first, since deciding it makes the most other clauses satisfied or forced (see
+        rules.negated_conjunction_propagation_rule). As all the clauses have two literals, the Jeroslow-Wang weights
+        2^-(length of the clause) are the same for all of them, and the score is simply the number of occurrences
+"""
+
+
+def oldest(interpretation, task):
+    """Key of a task for the heuristic "oldest" (all tasks are equal, so the order of the agenda is kept)."""
+    return 0
+
+
+def smallest(interpretation, task):
+    """Key of a task for the heuristic "smallest": the size of its formula."""
+    fml = task[1]
+    return fml.occur_var_count() + fml.binary_descr_global_count() + fml.descr_local_count() + fml.modal_count()
+
+
+def moms(interpretation, task):
+    """Key of a task for the heuristic "moms": minus the number of pending negated conjunctions of the world, which share
+    a subformula with the negated formula of the task."""
+    w, fml = task
+    pending = w._formulas['neg_conjunction']
+    score = 0
+    for sub in fml.sub._subformulas():
+        score += sum(1 for clause in interpretation._watches.get(sub, ()) if clause in pending)
+    return -score
+
+
+
+#heuristics by their names (the argument "heuristic" of build_tableau)
+HEURISTICS = {'oldest': oldest,
+              'smallest': smallest,
+              'moms': moms}
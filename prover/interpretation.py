@@ -1,23 +1,198 @@
+import generators
+
+
+#number of bits of the fingerprints of labels, minus 1 (see the function "fingerprint")
+FINGERPRINT_MASK = 127
+
+#the edges of a world with a modality type which has no edges (see Interpretation.related_worlds)
+_NO_EDGES = {}
+
+#minimal number of worlds of an interpretation, for which the index of labels is built (see Interpretation.worlds_with)
+INDEX_MIN_WORLDS = 32
+
+
+def fingerprint(fmls) -> int:
+    """Return the fingerprint of a set of formulas: an integer, in which the bit number hash(fml) & FINGERPRINT_MASK is set 
+    for each formula fml of the set (a Bloom filter). If the fingerprint of a set A does not contain all the bits of 
+    the fingerprint of a set B, then A does not contain all the formulas of B."""
+    bits = 0
+    for fml in fmls:
+        bits |= 1 << (hash(fml) & FINGERPRINT_MASK)
+    return bits
+
+
 
 class World:
     """Class for individuals/ Kripke worlds"""
-    __slots__ = '_formulas','_world_name_str', '_box_subformulas', '_candidates_blocking'
+    __slots__ = '_formulas', '_label', '_id', '_world_name_str', '_box_subformulas', '_candidates_blocking', '_shared', '_trail', '_agenda', '_deps', '_fingerprint', '_index'
 
     def __init__ (self, x):
         #Do not call constructor directly. Use Interpretations' add_world(x).”””
         self._formulas = x   #set (or list) of formulas satisfied in the world
-        self._world_name_str = None    #world name as a string object - serves to identify the world
+        self._label = dict.fromkeys(set.union(*x.values()), frozenset()) if isinstance(x, dict) else {}   #all formulas satisfied in the world (kept up to date with the sets in "_formulas"); a dictionary is used as an insertion-ordered set, with the dependency sets of the formulas as values (see add_formula)
+        self._id = None   #identifier of the world - an integer, unique in the interpretation and the same for the twin worlds in all its copies (set by Interpretation.add_world); serves to identify the world
+        self._world_name_str = None    #world name as a string object, given in the input; None for the worlds created by the tableau, whose names are generated only when they are printed (see Interpretation.world_names)
         self._box_subformulas = {} #a dictionary with modality types 'r' as keys; values are sets of formulas A, such that ~*E r A are satisfied in this world
         self._candidates_blocking = {} #a dictionary with worlds as keys; values are dictionaries with roles as keys, and as values - the blocked formulas of type *E r A, where r is the role in the key; the world in the primary key is a 'candidate' world with respect to all of the corresponding formulas
+        self._shared = frozenset()   #names of the structures (formula sets, '_label', '_box_subformulas') shared with a twin world in a forked interpretation; they are copied before they are modified for the first time (copy-on-write)
+        self._trail = None   #trail of the interpretation (see Interpretation.start_trail), on which the changes of the world are recorded; None if the changes are not recorded
+        self._agenda = None   #agenda of the tableau (see Interpretation.set_agenda), which is informed about the changes of the world; None if there is no agenda
+        self._deps = frozenset()   #dependency set of the creation of the world (and of the edge leading to it, if the world was created by the role rule)
+        self._fingerprint = fingerprint(self._label)   #fingerprint of the label (see the function "fingerprint"), updated when a formula is added to the label
+        self._index = None   #index of the labels of the interpretation (see Interpretation.worlds_with), updated when the label changes; None if the index is not built
 
                         
                         
     def formulas(self):
-        """Return formulas associated with this world."""
-        return (set.union(*self._formulas.values()) if isinstance(self._formulas, dict) else self._formulas) 
+        """Return formulas associated with this world (as a read-only, always up to date view)."""
+        return (self._label.keys() if isinstance(self._formulas, dict) else self._formulas) 
+
+    def set_formula_sets(self, formulas_dict: dict):
+        """Replace the dictionary of formula sets of the world and rebuild its label."""
+        self._formulas = formulas_dict
+        self._label = dict.fromkeys(set.union(*formulas_dict.values()), frozenset())
+        self._fingerprint = fingerprint(self._label)
+        self._shared = frozenset()
+
+    def add_formula(self, category: str, fml, deps: frozenset = frozenset()):
+        """Add a formula to the set "category" of the world (and to its label).
+        
+        deps: dependency set of the formula - identifiers of the branching points of the tableau on which the presence of 
+            the formula depends (used for backjumping); if the formula is already in the label, its dependency set is kept
+        """
+        if self._shared:
+            self._own(category)
+            self._own('_label')
+        if self._trail is not None:
+            self._trail.append((self._undo_add_formula, category, fml, fml in self._formulas[category], fml in self._label, self._fingerprint))
+        new_in_label = fml not in self._label
+        self._formulas[category].add(fml)
+        if new_in_label:
+            self._label[fml] = deps
+            self._fingerprint |= 1 << (hash(fml) & FINGERPRINT_MASK)
+            if self._index is not None:
+                self._index.setdefault(fml, set()).add(self)
+        if self._agenda is not None:
+            self._agenda.formula_added(self, category, fml, new_in_label)
+
+    def move_formula(self, fml, source: str, target: str = None):
+        """Move a formula from the set "source" to the set "target" of the world; the label does not change. 
+        If the target is None, the formula is removed from the world."""
+        if self._shared:
+            self._own(source)
+            self._own(target)
+            self._own('_label')
+        self._formulas[source].remove(fml)
+        if target is None:
+            removed_deps = None if any(fml in fml_set for fml_set in self._formulas.values()) else self._label.pop(fml)
+            if removed_deps is not None and self._index is not None:   #the fingerprint is not changed - it may contain formulas no longer in the label
+                self._index[fml].discard(self)
+            if self._trail is not None:
+                self._trail.append((self._undo_move_formula, fml, source, None, removed_deps))
+        else:
+            if self._trail is not None:
+                self._trail.append((self._undo_move_formula, fml, source, target, fml in self._formulas[target]))
+            self._formulas[target].add(fml)
+            if self._agenda is not None:
+                self._agenda.formula_added(self, target, fml, False)
+
+    def add_box_subformula(self, role: str, fml):
+        """Add a formula ~*E role A to the set of formulas stored for the role in "_box_subformulas"."""
+        if self._shared:
+            self._own('_box_subformulas')
+        was_present = role in self._box_subformulas and fml in self._box_subformulas[role]
+        if self._trail is not None:
+            self._trail.append((self._undo_add_box_subformula, role, fml, was_present))
+        if role in self._box_subformulas:
+            self._box_subformulas[role].add(fml)
+        else:
+            self._box_subformulas[role] = {fml}
+        if self._agenda is not None and not was_present:
+            self._agenda.box_subformula_added(self)
+
+    def set_candidates_blocking(self, candidates: dict):
+        """Replace the dictionary of candidate worlds for blocking. The dictionaries (and the sets of blocked formulas) 
+        are never modified in place, so that they can be shared by forked interpretations and restored from the trail."""
+        if self._trail is not None:
+            self._trail.append((setattr, self, '_candidates_blocking', self._candidates_blocking))
+        self._candidates_blocking = candidates
+
+    def add_blocked_formula(self, cand_world, role: str, fml):
+        """Store the formula *E role A as blocked, with cand_world as the candidate world."""
+        candidates = dict(self._candidates_blocking)
+        roles_dict = dict(candidates.get(cand_world, {}))
+        roles_dict[role] = roles_dict.get(role, frozenset()) | {fml}
+        candidates[cand_world] = roles_dict
+        self.set_candidates_blocking(candidates)
+
+
+
+    #UNDOING THE CHANGES RECORDED ON THE TRAIL
 
-    def __hash__ (self): # will allow worlds to be a map/set key
-        return hash(id(self))
+    def _undo_add_formula(self, category: str, fml, in_set: bool, in_label: bool, old_fingerprint: int):
+        if not in_set:
+            self._formulas[category].discard(fml)
+        if not in_label:
+            del self._label[fml]
+            self._fingerprint = old_fingerprint
+            if self._index is not None:
+                self._index[fml].discard(self)
+
+    def _undo_move_formula(self, fml, source: str, target: str, flag):
+        #flag: for target None - the dependency set of the formula, if it has been removed from the label (None otherwise); otherwise - whether the formula was already in the target set
+        if target is None:
+            if flag is not None:
+                self._label[fml] = flag
+                if self._index is not None:
+                    self._index.setdefault(fml, set()).add(self)
+        elif not flag:
+            self._formulas[target].discard(fml)
+        self._formulas[source].add(fml)
+
+    def _undo_add_box_subformula(self, role: str, fml, was_present: bool):
+        if not was_present:
+            self._box_subformulas[role].discard(fml)
+            if not self._box_subformulas[role]:
+                del self._box_subformulas[role]
+
+
+
+    #COPY-ON-WRITE
+
+    def _own(self, name: str):
+        """Copy a structure shared with a twin world, so that it can be modified in this world only."""
+        if name not in self._shared:
+            return
+        if name == '_label':
+            self._label = dict(self._label)
+        elif name == '_box_subformulas':
+            self._box_subformulas = {role: set(fmls) for role, fmls in self._box_subformulas.items()}
+        else:
+            self._formulas[name] = set(self._formulas[name])
+        self._shared = self._shared - {name}
+
+    def fork(self, shared: frozenset):
+        """Return a twin of the world for a forked interpretation. All structures are shared by both worlds until 
+        they are modified. Edges and candidate worlds for blocking are set by Interpretation.fork.
+        
+        Argument: names of all the structures of the world that can be shared
+        """
+        twin = World.__new__(World)
+        twin._formulas = dict(self._formulas)
+        twin._label = self._label
+        twin._id = self._id
+        twin._world_name_str = self._world_name_str
+        twin._box_subformulas = self._box_subformulas
+        twin._fingerprint = self._fingerprint
+        twin._index = None
+        twin._candidates_blocking = {}
+        twin._shared = self._shared = shared
+        twin._trail = None
+        twin._agenda = None
+        twin._deps = self._deps
+        return twin
+
+    __hash__ = object.__hash__ # will allow worlds to be a map/set key (identity hash, computed without a Python-level call)
 
 
 
@@ -25,18 +200,140 @@ class Interpretation:
     """Class for the whole Interpretation (Kripke structure). Each interpretation corresponds to a branch of the tableau"""
     def __init__ (self):
         #Create an empty Interpretation.
-        self._outgoing = {} #a dictionary with worlds as keys; values are dictionairies with world as keys and sets of strings indicating modality types of outgoing edges as values
-        self._incoming = {} #a dictionary with worlds as keys; values are dictionairies with world as keys and sets of strings indicating modality types of incoming edges as values
-        self._world_names_str  = set()   #set of all world names  in the interpretation
+        self._outgoing = {} #a dictionary with worlds as keys; values are dictionaries with modality types (strings) as keys and, as values, dictionaries with the destination worlds of the outgoing edges of this type as keys (used as insertion-ordered sets, with values None)
+        self._incoming = {} #a dictionary with worlds as keys; values are dictionaries with modality types (strings) as keys and, as values, dictionaries with the origin worlds of the incoming edges of this type as keys
+        self._world_names_str  = set()   #set of the world names given in the input
+        self._worlds_by_id = {}   #a dictionary with the identifiers of the worlds as keys, and the worlds as values
+        self._next_id = 0   #identifier of the next world added to the interpretation
         self._GlDesc_rule3_fml_set = set()   #set of formulas C, such that the tableua rule for the negation of a global description has been applied to a some formula iC.D in this interpretation 
-        self.TBox_formulas = set()    #set of formulas present in the TBox input
+        self.TBox_formulas = set()    #set of formulas present in the TBox input (general axioms, converted to negations of conjunctions)
+        self._watches = {}    #a dictionary with formulas C as keys; values are sets of formulas ~(C & D) and ~(D & C) watching C (see rules.negated_conjunction_propagation_rule)
+        self.TBox_absorbed = {}    #a dictionary with atoms as keys; values are lists of concepts D of the absorbed TBox axioms A -> D (see rules.lazy_unfolding_rule)
         self._LocDesc_rule3_list = [list(), list()]  ##set of formulas C, such that the tableua rule for the negation of a local description has been applied to a some formula i.C in this interpretation
+        self._all_atoms_in_interpretation = frozenset()    #set of atom names used in the input (the names of fresh atoms are different from them)
+        self._fresh_atoms_count = 0   #number of fresh atoms introduced in the interpretation (used to generate the names of fresh atoms, see new_fresh_atom)
+        self._trail = None    #list of records of all changes of the interpretation (and its worlds), which allows to undo them (see start_trail); None if the changes are not recorded
+        self._agenda = None   #agenda of the tableau, to which tasks are added when the interpretation changes (see set_agenda); None if there is no agenda
+        self._clash_deps = frozenset()   #dependency set of the last clash found in the interpretation (set by the clash rule)
+        self._label_index = None   #index of the labels of the worlds (see worlds_with); None if it has not been built
+        self._unified_parent = {}   #union-find structure of the classes of unified worlds (see unify): a dictionary with the identifiers of the worlds which are not roots of their classes as keys, and the identifiers of their parents as values
+        self._unified_classes = {}   #a dictionary with the identifiers of the roots of the classes of more than one world as keys; values are pairs (tuple of the identifiers of the worlds of the class, dependency set of the merges of the class)
+        self._unification_subjects = {}   #a dictionary with the subjects C of descriptions (iC.D or i.C) as keys; values are pairs (dependency set of the description, identifier of a world satisfying C or None), see rules.unification
+
+
+    def set_agenda(self, agenda):
+        """Attach the agenda of the tableau to the interpretation and its worlds (the agenda is informed about all 
+        their changes from now on)."""
+        self._agenda = agenda
+        for w in self.worlds():
+            w._agenda = agenda
+
+
+    #TRAIL OF CHANGES
+    #in the backtracking mode "trail" of the tableau, the branches are not explored on copies of the interpretation - 
+    #each change is recorded on the trail as a tuple (function, arguments) which undoes it, and closing a branch rewinds the trail 
+
+    def start_trail(self):
+        """Start recording all the changes of the interpretation and its worlds on the trail."""
+        self._trail = []
+        for w in self.worlds():
+            w._trail = self._trail
+
+    def trail_mark(self):
+        """Return the current position on the trail, to which the interpretation can be restored with undo_trail."""
+        return len(self._trail)
+
+    def undo_trail(self, mark: int):
+        """Undo all the changes recorded on the trail after the position "mark" (in the reverse order)."""
+        trail = self._trail
+        while len(trail) > mark:
+            undo = trail.pop()
+            undo[0](*undo[1:])
+
+    def register(self, attribute: str, element):
+        """Add an element to the set stored in the given attribute of the interpretation (e.g. '_GlDesc_rule3_fml_set'), 
+        recording the undo on the trail."""
+        elements = getattr(self, attribute)
+        if self._trail is not None and element not in elements:
+            self._trail.append((elements.discard, element))
+        elements.add(element)
 
+    def new_fresh_atom(self):
+        """Return the name of a new fresh atom: Fresh_Atom_1, Fresh_Atom_2, Fresh_Atom_3,... are introduced in this order 
+        (skipping the names used in the input), so a counter of the interpretation is enough to know which names have 
+        been used so far in the branch (see generators.fresh_atom_name)."""
+        if self._trail is not None:
+            self._trail.append((setattr, self, '_fresh_atoms_count', self._fresh_atoms_count))
+        while True:
+            self._fresh_atoms_count += 1
+            x = generators.fresh_atom_name(self._fresh_atoms_count)
+            if x not in self._all_atoms_in_interpretation:
+                return x
+
+    def add_LocDesc_rule3(self, fml, fresh_atom):
+        """Store a formula C and the fresh atom introduced for it by the rule for negated local descriptions."""
+        if self._trail is not None:
+            self._trail.append((self._LocDesc_rule3_list[0].pop,))
+            self._trail.append((self._LocDesc_rule3_list[1].pop,))
+        self._LocDesc_rule3_list[0].append(fml)
+        self._LocDesc_rule3_list[1].append(fresh_atom)
+
+
+    def fork(self):
+        """Return a copy of the interpretation, to be explored on a new branch of the tableau.
+
+        Unlike deepcopy, the cost of forking does not depend on the number of formulas: the worlds of the new 
+        interpretation share their formula sets with the worlds of this interpretation, and each set is copied only 
+        when it is modified for the first time in either of the two interpretations (copy-on-write). 
+        """
+        new = Interpretation()
+
+        shared = frozenset(next(iter(self._outgoing))._formulas).union(('_label', '_box_subformulas')) if self._outgoing else frozenset()
+        twins = {w: w.fork(shared) for w in self._outgoing}
+
+        new._outgoing = {twins[u]: {x: dict.fromkeys(twins[v] for v in worlds) for x, worlds in roles.items()} for u, roles in self._outgoing.items()}
+        new._incoming = {twins[u]: {x: dict.fromkeys(twins[v] for v in worlds) for x, worlds in roles.items()} for u, roles in self._incoming.items()}
+        for w, twin in twins.items():
+            twin._candidates_blocking = {twins[cand_world]: roles_dict for cand_world, roles_dict in w._candidates_blocking.items()}
+
+        new._world_names_str = self._world_names_str   #never modified by the tableau
+        new._worlds_by_id = {w_id: twins[w] for w_id, w in self._worlds_by_id.items()}
+        new._next_id = self._next_id
+        new._GlDesc_rule3_fml_set = set(self._GlDesc_rule3_fml_set)
+        new._LocDesc_rule3_list = [list(self._LocDesc_rule3_list[0]), list(self._LocDesc_rule3_list[1])]
+        new._all_atoms_in_interpretation = self._all_atoms_in_interpretation   #never modified
+        new._fresh_atoms_count = self._fresh_atoms_count
+        new.TBox_formulas = self.TBox_formulas   #never modified - new worlds receive a copy of it
+        new.TBox_absorbed = self.TBox_absorbed   #never modified
+        new._watches = self._watches   #only extended, and valid for all branches
+        new._unified_parent = dict(self._unified_parent)
+        new._unified_classes = dict(self._unified_classes)
+        new._unification_subjects = dict(self._unification_subjects)
+
+        return new
 
     def worlds(self):
         """Return an iteration of all worlds of the Interpretation."""
         return self._outgoing.keys()
 
+    def world_by_id(self, w_id: int):
+        """Return the world with the given identifier (in constant time)."""
+        return self._worlds_by_id[w_id]
+
+    def world_names(self):
+        """Return a dictionary with all worlds as keys, and their names as values. The worlds from the input keep their 
+        names, and the worlds created by the tableau are named w1, w2, w3,... in the order of their creation, skipping 
+        the names from the input (see generators.world_names). The names are generated only here, when they are needed 
+        for printing, and not when the worlds are created."""
+        new_names = (name for name in generators.world_names() if name not in self._world_names_str)
+        return {w: next(new_names) if w._world_name_str is None else w._world_name_str for w in self._worlds_by_id.values()}
+
+    def get_world(self, name: str):
+        """Return the world with the given name (see world_names), or None if there is no such world."""
+        for w, w_name in self.world_names().items():
+            if w_name == name:
+                return w
+
     def add_world(self, x: list):
         """Insert and return a new world with element x.
         
@@ -45,22 +342,61 @@ class Interpretation:
         Output: the world object itself
         """
         w = World(x)
+        w._id = self._next_id
+        self._next_id += 1
+        self._worlds_by_id[w._id] = w
         self._outgoing[w] = {}
         self._incoming[w] = {} # need distinct map for incoming edges
+        if self._label_index is not None:
+            self._index_world(w)
+        if self._trail is not None:
+            w._trail = self._trail
+            self._trail.append((self._remove_world, w))
+        if self._agenda is not None:
+            w._agenda = self._agenda
+            if isinstance(x, dict):
+                self._agenda.world_added(w)
         return w  
 
+    def _remove_world(self, w: World):
+        #undoing add_world (the edges of the world have already been removed from the trail)
+        del self._outgoing[w]
+        del self._incoming[w]
+        del self._worlds_by_id[w._id]
+        self._next_id = w._id
+        if self._label_index is not None:
+            for fml in w._label:
+                self._label_index[fml].discard(w)
+
     def add_edge(self, u, w, x: str):
-        """Insert and return a new world with element x.
+        """Insert a new edge of modality type x from the world u to the world w (in constant time).
         
         Arguments:
             u: origin world of the edge
             w: destination world of the edge
             x: auxilliary element - modality type associated with the edge (given as a string)
-        
-        Output: the world object itself
         """
-        self._outgoing[u][w] = {x} if w not in self._outgoing[u] else self._outgoing[u][w].union({x})
-        self._incoming[w][u] = {x} if u not in self._incoming[w] else self._incoming[w][u].union({x})
+        outgoing = self._outgoing[u].setdefault(x, {})
+        if w in outgoing:
+            return
+        if self._trail is not None:
+            self._trail.append((self._remove_edge, u, w, x))
+        outgoing[w] = None
+        self._incoming[w].setdefault(x, {})[u] = None
+
+    def _remove_edge(self, u: World, w: World, x: str):
+        #undoing add_edge
+        for edges, v in ((self._outgoing[u], w), (self._incoming[w], u)):
+            del edges[x][v]
+            if not edges[x]:
+                del edges[x]
+
+    def edges(self):
+        """Generate all edges of the interpretation as triples: (modality type, origin world, destination world)."""
+        for u, roles in self._outgoing.items():
+            for x, worlds in roles.items():
+                for w in worlds:
+                    yield (x, u, w)
 
     def edge_exists(self, w: World, x: str):
         """Check if there exists any edge of modality type x outgoing from the world w.
@@ -71,7 +407,7 @@ class Interpretation:
         
         Output: True if any edge exists, False otherwise
         """
-        return any({x in i for i in self._outgoing[w].values()})
+        return x in self._outgoing[w]
 
     def related_worlds(self, w: World, x: str):
         """Which worlds are connected with with the given world w (as origin) with the modality type x
@@ -80,14 +416,10 @@ class Interpretation:
             w: origin world 
             x: modality type (given as a string)
         
-        Output: List of world connected with the world w (as origin) with the modality type r 
+        Output: a read-only view of the worlds connected with the world w (as origin) with the modality type x, in the 
+            order of adding the edges (it has a length and allows checking whether a world is connected in constant time)
         """
-        worlds = list() 
-        for world, edge_types in self._outgoing[w].items():
-            if x in edge_types:
-                worlds.append(world)
-        return(worlds)
-
+        return self._outgoing[w].get(x, _NO_EDGES).keys()
 
     def unrelated_worlds(self, w: World, x: str):
         """Which worlds are not connected with with the given world w (as origin) with the modality type x
@@ -96,9 +428,111 @@ class Interpretation:
             w: origin world
             x: modality type (given as a string)
         
-        Output: List of world not connected with the world w (as origin) with the modality type r 
+        Output: an iterator over the worlds not connected with the world w (as origin) with the modality type x, in the 
+            order of adding the worlds (the list of all worlds is not created)
         """
-        return(list(set(self._outgoing.keys()) - set(self.related_worlds(w,x))))
+        related = self._outgoing[w].get(x, _NO_EDGES)
+        return (world for world in self._outgoing if world not in related)
+
+    def blocking_candidate(self, w: World, x: str, fmls: list):
+        """Return the first world (in the order of adding the worlds) not connected with the world w by the modality type x, 
+        whose label contains all the given formulas (see the role rule for "Ǝr"); None if there is no such world.
+
+        The worlds are not compared with all the formulas one by one: in a large interpretation, the candidates are found 
+        by intersecting the sets of worlds containing each of the formulas (see worlds_with); otherwise the worlds whose 
+        label fingerprints do not contain the fingerprint of the formulas are skipped.
+        """
+        related = self.related_worlds(w, x)
+        if len(self._outgoing) >= INDEX_MIN_WORLDS:
+            candidates = self.worlds_with(fmls).difference(related)
+            #the identifiers of the worlds follow the order of adding them, so the first world is found among the candidates only
+            return min(candidates, key = lambda world: world._id, default = None)
+        bits = fingerprint(fmls)
+        for world in self._outgoing:
+            if world._fingerprint & bits == bits and world not in related and all(fml in world._label for fml in fmls):
+                return world
+        return None
+
+    def worlds_with(self, fmls: list):
+        """Return the set of worlds whose labels contain all the given formulas (a non-empty list).
+
+        The index of labels - a dictionary with formulas as keys and sets of worlds whose labels contain the formula as 
+        values - is built when it is needed for the first time, and then it is updated by the worlds when their labels 
+        change. A forked interpretation has its own index, built when it is needed.
+        """
+        if self._label_index is None:
+            self._label_index = {}
+            for world in self._outgoing:
+                self._index_world(world)
+        postings = sorted((self._label_index.get(fml, set()) for fml in fmls), key = len)
+        return postings[0].intersection(*postings[1:])
+
+    def worlds_satisfying(self, fml) -> list:
+        """Return the list of worlds whose labels contain the formula, in the order of adding the worlds (in a large 
+        interpretation, they are found in the index of labels - see worlds_with)."""
+        if len(self._outgoing) >= INDEX_MIN_WORLDS:
+            return sorted(self.worlds_with([fml]), key = lambda w: w._id)
+        return [w for w in self._outgoing if fml in w._label]
+
+    def _index_world(self, w: World):
+        #adding the formulas of the label of a world to the index of labels
+        for fml in w._label:
+            self._label_index.setdefault(fml, set()).add(w)
+        w._index = self._label_index
+
+
+
+    #UNIFIED WORLDS
+    #worlds which have to denote the same individual (see the second rules for descriptions) are kept in classes of a 
+    #union-find structure over the identifiers of the worlds; the smaller class is always attached to the root of the 
+    #larger one and the paths are not compressed, so finding the root takes logarithmic time, and each merge changes 
+    #a single link, which can be undone from the trail
+
+    def unified_root(self, w_id: int) -> int:
+        """Return the identifier of the root of the class of the world with the given identifier."""
+        parent = self._unified_parent
+        while w_id in parent:
+            w_id = parent[w_id]
+        return w_id
+
+    def unified_class(self, w_id: int):
+        """Return the class of the world with the given identifier, as a pair (tuple of the identifiers of the worlds of 
+        the class, dependency set of all the merges of the class)."""
+        root = self.unified_root(w_id)
+        return self._unified_classes.get(root, ((root,), frozenset()))
+
+    def unify(self, u_id: int, v_id: int, deps: frozenset) -> bool:
+        """Merge the classes of two worlds (given by their identifiers); deps - the dependency set of the merge. 
+        
+        Output: False if the worlds are already in the same class (the roots of their classes are the same), True otherwise
+        """
+        u_root, v_root = self.unified_root(u_id), self.unified_root(v_id)
+        if u_root == v_root:
+            return False
+        u_class, v_class = self.unified_class(u_root), self.unified_class(v_root)
+        if len(u_class[0]) < len(v_class[0]):
+            u_root, v_root, u_class, v_class = v_root, u_root, v_class, u_class
+        if self._trail is not None:
+            self._trail.append((self._undo_unify, u_root, v_root, self._unified_classes.get(u_root)))
+        self._unified_parent[v_root] = u_root
+        self._unified_classes[u_root] = (u_class[0] + v_class[0], u_class[1] | v_class[1] | deps)
+        return True
+
+    def _undo_unify(self, u_root: int, v_root: int, u_class):
+        #undoing unify (the entry of the class of v_root is kept by unify, so it is valid again)
+        del self._unified_parent[v_root]
+        if u_class is None:
+            del self._unified_classes[u_root]
+        else:
+            self._unified_classes[u_root] = u_class
+
+    def add_unification_subject(self, fml, deps: frozenset, w_id):
+        """Store the subject C of a description (see rules.unification), with the dependency set of the description and 
+        the identifier of a world satisfying C (None if there is no such world)."""
+        if self._trail is not None:
+            old = self._unification_subjects.get(fml)
+            self._trail.append((self._unification_subjects.pop, fml) if old is None else (self._unification_subjects.__setitem__, fml, old))
+        self._unification_subjects[fml] = (deps, w_id)
 
                 
 
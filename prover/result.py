@@ -0,0 +1,87 @@
+from collections import namedtuple
+
+
+class TableauResult(namedtuple('TableauResult', ['time_out', 'is_satisfiable', 'closed_branches_count', 'no_rules_applied'])):
+    """Class for the result of building the tableau (see DL_Tableau.build_tableau).
+
+    The result is a tuple of four elements (the form of the output used in the experiments):
+        [0] time_out: True, if the formula is a time-out, False otherwise
+        [1] is_satisfiable: True, if the formula is satisfiable, False otherwise (None in the case of a time-out)
+        [2] closed_branches_count: number of closed branches
+        [3] no_rules_applied: number of applied rules
+    Other attributes:
+        exceeded_budget: the name of the budget which was exceeded (see build_tableau), if the formula is a time-out;
+            'killed' - the process building the tableau was killed (see batch.check_many); None - no budget was exceeded
+        pruned_branches_count: number of branches not explored as a result of backjumping
+        model: the interpretation of the last explored branch (see Model); None if it is not known
+    """
+
+    def __new__(cls, time_out, is_satisfiable, closed_branches_count, no_rules_applied, exceeded_budget = None, pruned_branches_count = 0, model = None):
+        self = super().__new__(cls, time_out, is_satisfiable, closed_branches_count, no_rules_applied)
+        self.exceeded_budget = exceeded_budget
+        self.pruned_branches_count = pruned_branches_count
+        self.model = model
+        return self
+
+    def __repr__(self):
+        return (f"TableauResult(time_out={self.time_out}, is_satisfiable={self.is_satisfiable}, exceeded_budget={self.exceeded_budget!r}, "
+                f"closed_branches_count={self.closed_branches_count}, pruned_branches_count={self.pruned_branches_count}, no_rules_applied={self.no_rules_applied})")
+
+    def status(self):
+        """Return the information about the satisfiability of the input, as a sentence."""
+        if self.time_out:
+            return f"Time-out limit reached (budget: {self.exceeded_budget}) - no information about satisfiability"
+        elif self.is_satisfiable:
+            return "Input is satisfiable"
+        else:
+            return "Input is not satisfiable"
+
+
+
+class Model:
+    """Class for a read-only view of the interpretation built by the tableau (individuals, their concepts and roles).
+
+    Nothing is copied or formatted when the view is created - the individuals, concepts and roles are read from the
+    interpretation only when they are requested. Note that the interpretation should not be considered as a proper model
+    (see README).
+    """
+
+    def __init__(self, interpretation):
+        self._interpretation = interpretation
+
+    def individuals(self):
+        """Return a list of the names of all individuals."""
+        return list(self._interpretation.world_names().values())
+
+    def concepts(self, individual: str):
+        """Return the concepts satisfied by the individual with the given name (as a read-only view)."""
+        world = self._interpretation.get_world(individual)
+        if world is None:
+            raise KeyError(individual)
+        return world.formulas()
+
+    def roles(self):
+        """Generate all role links of the interpretation as triples: (role, origin individual, destination individual)."""
+        names = self._interpretation.world_names()
+        for mod_type, v1, v2 in self._interpretation.edges():
+            yield (mod_type, names[v1], names[v2])
+
+    def to_dict(self):
+        """Return a dictionary with the names of individuals as keys, and lists of their concepts (as strings) as values,
+        and the key 'roles' with the list of all role links (see roles)."""
+        model = {name: [str(fml) for fml in w.formulas()] for w, name in self._interpretation.world_names().items()}
+        model['roles'] = list(self.roles())
+        return model
+
+    def __str__(self):
+        """Return the printout of the interpretation: the names of the individuals followed by all their concepts, and
+        then the role links between the individuals."""
+        lines = []
+        for w, name in self._interpretation.world_names().items():
+            lines.append(f"Individual name: {name} \n Concepts:")
+            for fml in w.formulas():
+                lines.append(f"   {fml}")  #print the formulas in "nice" looking form
+            lines.append("\n")
+        for mod_type, v1, v2 in self.roles():
+            lines.append(f"Role type: {mod_type} \n Origin individual: {v1} \n Destination individual: {v2} \n")
+        return "\n".join(lines)
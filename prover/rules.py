@@ -1,9 +1,7 @@
 import forms
-from copy import deepcopy
-import generators
 
 
-def relocate_to_new_fml_sets(formulas_dict, new_fml):
+def relocate_to_new_fml_sets(world, new_fml, deps = frozenset()):
     """ Place each new formula, that appeared in a given world as a result of applying a rule, in one of the subsets: 
     "new_fml_posit" of "new_fml_negat" - depending on whether it is a negation. This is done to limit applygin the 
     clash rule to comparing those new formulas to all the others, already present in the world before applyting the 
@@ -11,25 +9,82 @@ def relocate_to_new_fml_sets(formulas_dict, new_fml):
 
     Arguments: 
         new_fml: a new formula, that appears in the world as an effect of applying a given rule    
-        formulas_dict: an object of the form "w._formulas", where "w" is the world in which the new formula appears
-            and "_formulas" is its attribute containing the dictionary of formulas
+        world: the world in which the new formula appears (its label is updated as well)
+        deps: dependency set of the new formula - the union of the dependency sets of the premises of the rule and, for 
+            an option of a branching rule, the identifier of the branching point (see build_tableau)
     
     """
     if isinstance(new_fml, forms.Negation):
-        formulas_dict['new_fml_negat'].update({new_fml}) 
+        world.add_formula('new_fml_negat', new_fml, deps)
     else:
-        formulas_dict['new_fml_posit'].update({new_fml}) 
+        world.add_formula('new_fml_posit', new_fml, deps)
+
+
+
+def worlds_to_check(interpretation, task):
+    """ Return the worlds which have to be checked by a rule: all worlds of the interpretation if the task is None, 
+    otherwise only the world of the task (see formulas_to_check)."""
+    return interpretation.worlds() if task is None else (task[0],)
+
+
+
+def formulas_to_check(world, task, *categories):
+    """ Return a list of formulas from the given sets of formulas of the world, which have to be checked by a rule. 
+    The formulas from each set are ordered by their hashes, so that the order does not depend on the layout of the set 
+    (which changes when the interpretation is copied to another process).
+
+    Arguments: 
+        world: the world that is checked
+        task: a task from the agenda of the tableau (see the script "agenda"): None or (world, None) - all the formulas 
+            from the sets are checked; (world, formula) - only the given formula is checked, if it is still in one of the sets
+        categories: names of the sets of formulas
+    """
+    if task is None or task[1] is None:
+        return [fml for category in categories for fml in sorted(world._formulas[category], key = hash)]
+    elif any(task[1] in world._formulas[category] for category in categories):
+        return [task[1]]
+    else:
+        return []
+
+
+
+def branching_option(w_id, new_fmls, deps, premise = None):
+    """ Return an option of a branching rule (see below), which places the new formulas in the world with the given name.
+    The semantic branching of negated conjunctions and the cut rules differ only in the formulas of their options.
+
+    Arguments: 
+        w_id: identifier of the world (the option is applied to a copy of the interpretation, so the world is found by its identifier)
+        new_fmls: the formulas introduced by the option
+        deps: dependency set of the premises of the rule (the identifier of the branching point is added to it)
+        premise: None, or a triple (formula, set of formulas, set of formulas) - the premise of the rule is moved from the
+            first set of formulas of the world to the second one, as a processed formula
+    """
+    def option(interp, branch):
+        w_opt = interp.world_by_id(w_id)
+        for new_fml in new_fmls:
+            relocate_to_new_fml_sets(w_opt, new_fml, deps | branch)
+        if premise is not None:
+            w_opt.move_formula(*premise)
+    return option
 
 
 
 """
-All the functions below implement rules of the calculus TAB(ALCi). Each function takes an interpretation as an 
-argument, and outpus 4 elements:
+All the functions below implement rules of the calculus TAB(ALCi). Each function takes an interpretation and 
+(optionally) a task from the agenda of the tableau as arguments - without a task, the rule checks the whole interpretation. 
+It outpus 4 elements:
 
 [0] the modified interpretation (Intepretation object)
 [1] True if inconsistency was found (can happen only for the Clash rule), False otherwise
 [2] True if the rule has been applied, False otherwise
-[3] list of "alternative interpretations" that correspond to new branches of the tableau; for deterministic rules, this list is empty
+[3] list of options of a branching rule; for deterministic rules, this list is empty
+
+An option is a function that applies one of the alternative conclusions of a branching rule to an interpretation 
+(given as its first argument; worlds are identified by their identifiers, see Interpretation.add_world). Its second argument is the dependency set of the 
+branching point (see build_tableau), which is added to the dependency sets of the formulas introduced by the option. A branching rule does not modify the 
+interpretation itself: the tableau applies the first option to the current interpretation, and the remaining 
+options correspond to new branches of the tableau - they are applied to copies of the interpretation or, in the 
+backtracking mode "trail", to the same interpretation after undoing the changes made on the closed branch.
     
 """
 
@@ -39,67 +94,47 @@ argument, and outpus 4 elements:
 #CLASH RULE -------------------------------------------------
 
 
-def clash_rule(interpretation):
+def clash_rule(interpretation, task = None):
     """ Function implementing the Clash rule"""
     
-    for w in interpretation.worlds():
-        
-        #number of new formulas
-        no_new_fmls = len(w._formulas['new_fml_posit'] | w._formulas['new_fml_negat'])
+    for w in worlds_to_check(interpretation, task):
 
-        if no_new_fmls == 0:
-            continue #no new formulas, pass to the next world        
-
-        else:
-            if no_new_fmls>1:   #check for consistency among the new formulas         
-                fml_pairs_generator = ((new_posit_fml, new_negat_fml) for new_posit_fml in w._formulas['new_fml_posit'] for new_negat_fml in w._formulas['new_fml_negat'])         
-    
-                for pair in fml_pairs_generator:
-                    if pair[0] == pair[1].sub:
-                        return(interpretation, True, True, [])
-            
-            #positive new formulas vs negative formulas
-            fml_pairs_generator = ((new_posit_fml, neg_fml) for new_posit_fml in w._formulas['new_fml_posit'] for neg_fml in (w._formulas['neg_atoms'] | w._formulas['neg_conjunction'] | w._formulas['neg_diamond'] | w._formulas['neg_global_desc'] | w._formulas['neg_local_desc'] | w._formulas['proc_negat']) )        
-
-            for pair in fml_pairs_generator:
-                if pair[0] == pair[1].sub:
+        #each new formula is compared with all the formulas of the world (including the other new formulas) by looking up its complement in the label
+        for new_fml_set in (w._formulas['new_fml_posit'], w._formulas['new_fml_negat']):
+            for new_fml in new_fml_set:
+                if new_fml.complement in w._label:
+                    interpretation._clash_deps = w._label[new_fml] | w._label[new_fml.complement]
                     return(interpretation, True, True, [])
-                
-            #negative new formulas vs positive formulas            
-            fml_pairs_generator = ((new_negat_fml, pos_fml) for new_negat_fml in w._formulas['new_fml_negat']  for pos_fml in (w._formulas['atoms'] | w._formulas['conjunction'] | w._formulas['diamond'] | w._formulas['global_desc'] | w._formulas['local_desc'] | w._formulas['proc_posit'] | w._formulas['proc_global_desc'] | w._formulas['proc_local_desc']) )  
 
-            for pair in fml_pairs_generator:
-                if pair[0].sub == pair[1]:
-                    return(interpretation, True, True, [])
-            
-            for new_fml in w._formulas['new_fml_negat']:
-                if isinstance(new_fml.sub, forms.Negation):
-                    w._formulas['double_neg'].update({new_fml}) 
-                elif isinstance(new_fml.sub, forms.Atom):
-                    w._formulas['neg_atoms'].update({new_fml}) 
-                elif isinstance(new_fml.sub, forms.Conjunction):
-                    w._formulas['neg_conjunction'].update({new_fml})
-                elif isinstance(new_fml.sub, forms.Diamond):
-                    w._formulas['neg_diamond'].update({new_fml})              
-                elif isinstance(new_fml.sub, forms.Description_Global):
-                    w._formulas['neg_global_desc'].update({new_fml})              
-                elif isinstance(new_fml.sub, forms.Description_Local):
-                    w._formulas['neg_local_desc'].update({new_fml})              
-                        
-            for new_fml in w._formulas['new_fml_posit']:                
-                if isinstance(new_fml, forms.Atom):
-                    w._formulas['atoms'].update({new_fml}) 
-                elif isinstance(new_fml, forms.Conjunction):
-                    w._formulas['conjunction'].update({new_fml}) 
-                elif isinstance(new_fml, forms.Diamond):
-                    w._formulas['diamond'].update({new_fml})              
-                elif isinstance(new_fml, forms.Description_Global):
-                    w._formulas['global_desc'].update({new_fml})              
-                elif isinstance(new_fml, forms.Description_Local):
-                    w._formulas['local_desc'].update({new_fml})              
-
-            w._formulas['new_fml_negat'] = set()
-            w._formulas['new_fml_posit'] = set()
+        for new_fml in sorted(w._formulas['new_fml_negat'], key = hash):
+            if isinstance(new_fml.sub, forms.Negation):
+                w.move_formula(new_fml, 'new_fml_negat', 'double_neg')
+            elif isinstance(new_fml.sub, forms.Atom):
+                w.move_formula(new_fml, 'new_fml_negat', 'neg_atoms')
+            elif isinstance(new_fml.sub, forms.Conjunction):
+                w.move_formula(new_fml, 'new_fml_negat', 'neg_conjunction')
+            elif isinstance(new_fml.sub, forms.Diamond):
+                w.move_formula(new_fml, 'new_fml_negat', 'neg_diamond')
+            elif isinstance(new_fml.sub, forms.Description_Global):
+                w.move_formula(new_fml, 'new_fml_negat', 'neg_global_desc')
+            elif isinstance(new_fml.sub, forms.Description_Local):
+                w.move_formula(new_fml, 'new_fml_negat', 'neg_local_desc')
+            else:
+                w.move_formula(new_fml, 'new_fml_negat', None)
+                    
+        for new_fml in sorted(w._formulas['new_fml_posit'], key = hash):
+            if isinstance(new_fml, forms.Atom):
+                w.move_formula(new_fml, 'new_fml_posit', 'atoms')
+            elif isinstance(new_fml, forms.Conjunction):
+                w.move_formula(new_fml, 'new_fml_posit', 'conjunction')
+            elif isinstance(new_fml, forms.Diamond):
+                w.move_formula(new_fml, 'new_fml_posit', 'diamond')
+            elif isinstance(new_fml, forms.Description_Global):
+                w.move_formula(new_fml, 'new_fml_posit', 'global_desc')
+            elif isinstance(new_fml, forms.Description_Local):
+                w.move_formula(new_fml, 'new_fml_posit', 'local_desc')
+            else:
+                w.move_formula(new_fml, 'new_fml_posit', None)
 
 
     return (interpretation, False, False, [])            
@@ -109,24 +144,22 @@ def clash_rule(interpretation):
 #RULE DOUBLE NEGATION ----------------------------
 
 
-def double_neg_rule(interpretation):
+def double_neg_rule(interpretation, task = None):
     """ Function implementing the propositional rule for double negation"""
 
 
-    for w in interpretation.worlds():
+    for w in worlds_to_check(interpretation, task):
 
-        fml_set_copy = list(w._formulas['double_neg'])
+        fml_set_copy = formulas_to_check(w, task, 'double_neg')
 
         for fml in fml_set_copy:        
 
-            if fml.sub.sub in set.union(*w._formulas.values()):
-                w._formulas['double_neg'].remove(fml) 
-                w._formulas['proc_negat'].update({fml}) 
+            if fml.sub.sub in w._label:
+                w.move_formula(fml, 'double_neg', 'proc_negat')
                 continue
             else:
-                relocate_to_new_fml_sets(w._formulas, fml.sub.sub)
-                w._formulas['double_neg'].remove(fml) 
-                w._formulas['proc_negat'].update({fml}) 
+                relocate_to_new_fml_sets(w, fml.sub.sub, w._label[fml])
+                w.move_formula(fml, 'double_neg', 'proc_negat')
         
             return(interpretation, False, True, [])
             
@@ -137,33 +170,31 @@ def double_neg_rule(interpretation):
 
 #RULE CONJUNCTION ----------------------------
 
-def conjunction_rule(interpretation):
+def conjunction_rule(interpretation, task = None):
     """ Function implementing the propositional rule for conjunction"""
     
-    for w in interpretation.worlds():
+    for w in worlds_to_check(interpretation, task):
 
-        fml_set_copy = list(w._formulas['conjunction'])
+        fml_set_copy = formulas_to_check(w, task, 'conjunction')
 
         for fml in fml_set_copy:        
 
 
-            v0 = fml.subs[0] in set.union(*w._formulas.values())
-            v1 = fml.subs[1] in set.union(*w._formulas.values())
+            v0 = fml.subs[0] in w._label
+            v1 = fml.subs[1] in w._label
 
             if v0 and v1:
-                w._formulas['conjunction'].remove(fml) 
-                w._formulas['proc_posit'].update({fml}) 
+                w.move_formula(fml, 'conjunction', 'proc_posit')
                 continue
             
             
             if not v0:
-                relocate_to_new_fml_sets(w._formulas, fml.subs[0])
+                relocate_to_new_fml_sets(w, fml.subs[0], w._label[fml])
                 
             if not v1:
-                relocate_to_new_fml_sets(w._formulas, fml.subs[1])
+                relocate_to_new_fml_sets(w, fml.subs[1], w._label[fml])
 
-            w._formulas['conjunction'].remove(fml) 
-            w._formulas['proc_posit'].update({fml}) 
+            w.move_formula(fml, 'conjunction', 'proc_posit')
 
 
             return(interpretation, False, True, [])
@@ -172,36 +203,112 @@ def conjunction_rule(interpretation):
 
 
 
+#RULE LAZY UNFOLDING ----------------------------
+
+def lazy_unfolding_rule(interpretation, task = None):
+    """ Function implementing the lazy unfolding of the absorbed TBox axioms A -> D (see DL_Tableau): the concepts D of all 
+    the axioms with the atom A on the left-hand side are added to each world containing A. Unlike the axioms converted to 
+    negated conjunctions, the absorbed axioms do not lead to branching, and they are not placed in the worlds without A"""
+
+    if not interpretation.TBox_absorbed:
+        return(interpretation, False, False, [])
+
+    for w in worlds_to_check(interpretation, task):
+
+        fml_set_copy = formulas_to_check(w, task, 'atoms')
+
+        for fml in fml_set_copy:
+
+            new_fmls = [consequent for consequent in interpretation.TBox_absorbed.get(fml, ()) if consequent not in w._label]
+
+            if new_fmls:
+                for consequent in new_fmls:
+                    relocate_to_new_fml_sets(w, consequent, w._label[fml])
+
+                return(interpretation, False, True, [])
+
+    return(interpretation, False, False, [])
+
+
+
 #RULE NEGATED CONJUNCTION ----------------------------
 
 
-def negated_conjunction_rule(interpretation):
-    """ Function implementing the propositional rule for conjunction"""
+def negated_conjunction_propagation_rule(interpretation, task = None):
+    """ Function implementing the unit propagation for negated conjunctions: each pending formula ~(C & D) of a world 
+    (in the set 'neg_conjunction') is a clause ~C v ~D; if C is already in the world, ~D is forced (and vice versa), 
+    so it is added without branching - if D is in the world as well, the clash rule closes the branch.
+
+    Both literals of each clause are watched: the clause is indexed by C and by D in the dictionary "_watches" of the 
+    interpretation, so when a new formula appears in a world, only the pending clauses of the world watching it are 
+    checked (the index is only extended, and it is shared by all branches - a clause is checked only if it is pending 
+    in the world). A task of this rule is a new formula or a new pending clause of a world."""
+
+    watches = interpretation._watches
+
+    for w in worlds_to_check(interpretation, task):
+
+        pending = w._formulas['neg_conjunction']
+
+        if task is None or task[1] is None:
+            clauses = sorted(pending, key = hash)
+        else:
+            clauses = [clause for clause in watches.get(task[1], ()) if clause in pending]
+            if task[1] in pending:
+                clauses.append(task[1])
+            clauses.sort(key = hash)
+
+        for fml in clauses:
+
+            for conjunct in fml.sub.subs:
+                watches.setdefault(conjunct, set()).add(fml)
+
+            if (fml.sub.subs[0].negation in w._label) or (fml.sub.subs[1].negation in w._label):
+                continue #the clause is already satisfied
+
+            for i in (0, 1):
+                if fml.sub.subs[i] in w._label: #the literal ~C is refuted, so ~D is forced
+                    relocate_to_new_fml_sets(w, forms.Negation(fml.sub.subs[1 - i]), w._label[fml] | w._label[fml.sub.subs[i]])
+                    w.move_formula(fml, 'neg_conjunction', 'proc_negat')
+                    return(interpretation, False, True, [])
+
+    return(interpretation, False, False, [])
+
+
+
+def negated_conjunction_rule(interpretation, task = None):
+    """ Function implementing the propositional rule for negated conjunction ~(C & D), with the options ~C and ~D"""
+    return negated_conjunction(interpretation, task, semantic = False)
+
+
+
+def semantic_negated_conjunction_rule(interpretation, task = None):
+    """ Function implementing the propositional rule for negated conjunction ~(C & D) with semantic branching: the 
+    options are ~C and (C, ~D), so the two branches are disjoint - the second one never repeats the models of the first"""
+    return negated_conjunction(interpretation, task, semantic = True)
+
+
 
-    for w in interpretation.worlds():
+def negated_conjunction(interpretation, task, semantic):
+    """ Common part of the rules for negated conjunction (see above); semantic - True for the semantic branching"""
 
-        fml_set_copy = list(w._formulas['neg_conjunction'])
+    for w in worlds_to_check(interpretation, task):
+
+        fml_set_copy = formulas_to_check(w, task, 'neg_conjunction')
 
         for fml in fml_set_copy:        
 
-            if (forms.Negation(fml.sub.subs[0]) in set.union(*w._formulas.values())) or (forms.Negation(fml.sub.subs[1]) in set.union(*w._formulas.values())):
+            if (fml.sub.subs[0].negation in w._label) or (fml.sub.subs[1].negation in w._label):
 
                 continue #to the next formula
             else:
-                alt_interpretation = deepcopy(interpretation)
-
-                relocate_to_new_fml_sets(w._formulas, forms.Negation(fml.sub.subs[0]))
-            
-                w._formulas['neg_conjunction'].remove(fml) 
-                w._formulas['proc_negat'].update({fml}) 
-            
-                for w_alt in alt_interpretation.worlds():
-                    if w_alt._world_name_str == w._world_name_str:
-                        relocate_to_new_fml_sets(w_alt._formulas, forms.Negation(fml.sub.subs[1]))
-                        w_alt._formulas['neg_conjunction'].remove(fml) 
-                        w_alt._formulas['proc_negat'].update({fml}) 
+                w_id = w._id
+                fml_deps = w._label[fml]
+                premise = (fml, 'neg_conjunction', 'proc_negat')
+                second_option = (fml.sub.subs[0], forms.Negation(fml.sub.subs[1])) if semantic else (forms.Negation(fml.sub.subs[1]),)
                         
-                return(interpretation, False, True, [alt_interpretation])
+                return(interpretation, False, True, [branching_option(w_id, (forms.Negation(fml.sub.subs[0]),), fml_deps, premise), 
+                                                     branching_option(w_id, second_option, fml_deps, premise)])
 
     return(interpretation, False, False, [])                   
 
@@ -211,36 +318,38 @@ def negated_conjunction_rule(interpretation):
 # ROLE RULE 1  ----------------------------
 
 
-def role_rule_1(interpretation):
+def role_rule_1(interpretation, task = None):
     """ Function implementing the role rule for "Ǝr" """
     
-    for w in interpretation.worlds():
+    for w in worlds_to_check(interpretation, task):
 
         cand_blocking_new = {}        
 
-        #updating the list of 'candidate worlds' and (within it) - blocked diamond formulas 
-        if bool(w._candidates_blocking) and bool(w._box_subformulas):
+        #updating the list of 'candidate worlds' and (within it) - blocked diamond formulas; the labels of the candidate worlds 
+        #only grow, so a candidate world can stop blocking only when a box formula is added to w (the task is then (w, None))
+        if (task is None or task[1] is None) and bool(w._candidates_blocking) and bool(w._box_subformulas):
+            blocking_changed = False
             for cand_world, roles_dict in w._candidates_blocking.items():
                 cand_blocking_new[cand_world] = {}
                 for role, blocked_forms  in roles_dict.items():
                     cand_blocking_new[cand_world][role] = blocked_forms
                     if role in w._box_subformulas.keys():
-                        if w._box_subformulas[role] <= set.union(*cand_world._formulas.values()): #if for all formulas X such that box(X) are in world w, X is in the candidate world
+                        if w._box_subformulas[role] <= cand_world._label.keys(): #if for all formulas X such that box(X) are in world w, X is in the candidate world
                             pass 
                         else:
                             for bfml in blocked_forms: #the blocked formula is removed from the 'processed' set - it will have to be analysed again
-                                w._formulas['proc_posit'].remove(bfml) 
-                                w._formulas['diamond'].update({bfml})
+                                w.move_formula(bfml, 'proc_posit', 'diamond')
                             
                             del cand_blocking_new[cand_world][role] 
+                            blocking_changed = True
                 
                 if not bool(cand_blocking_new[cand_world]):
                     del cand_blocking_new[cand_world]
                           
-                            
-        w._candidates_blocking = cand_blocking_new
+            if blocking_changed:
+                w.set_candidates_blocking(cand_blocking_new)
         
-        fml_set_copy = list(w._formulas['diamond'])
+        fml_set_copy = formulas_to_check(w, task, 'diamond')
 
         for fml in fml_set_copy:        
 
@@ -250,27 +359,22 @@ def role_rule_1(interpretation):
             #Option1 - looking for a related world
             rel_worlds_list = interpretation.related_worlds(w, fml.role) #list of worlds related with w by role indicated in the "diamond" formula
             if len(rel_worlds_list)>0:   #if any world is related to w, with the relation role  
-               if any({fml.sub2 in set.union(*rel_w._formulas.values()) for rel_w in rel_worlds_list}): #does any of the related worlds contain the formula indicated in the "diamond" formula?
+               if any(fml.sub2 in rel_w._label for rel_w in rel_worlds_list): #does any of the related worlds contain the formula indicated in the "diamond" formula?
                   
                    #mark the analysed formula fml as processed
-                   w._formulas['diamond'].remove(fml) 
-                   w._formulas['proc_posit'].update({fml}) 
+                   w.move_formula(fml, 'diamond', 'proc_posit')
 
                    return(interpretation, False, True, []) #rule applied, exit
                   
            
-            #Option 2 - looking for a "candidate world"
-            for unrel_v in interpretation.unrelated_worlds(w, fml.role): 
-                if (fml.sub2 in set.union(*unrel_v._formulas.values())) and (fml.role not in w._box_subformulas.keys() or w._box_subformulas[fml.role] <= set.union(*unrel_v._formulas.values())):
-                    if unrel_v in w._candidates_blocking.keys():
-                        w._candidates_blocking[unrel_v][fml.role].update({fml})
-                    else:
-                        w._candidates_blocking[unrel_v] = {fml.role: {fml}}
+            #Option 2 - looking for a "candidate world": an unrelated world containing the formula indicated in the "diamond" formula, and all formulas X such that box(X) is in w
+            unrel_v = interpretation.blocking_candidate(w, fml.role, [fml.sub2, *w._box_subformulas.get(fml.role, ())])
+            if unrel_v is not None:
+                w.add_blocked_formula(unrel_v, fml.role, fml)
 
-                    w._formulas['diamond'].remove(fml) 
-                    w._formulas['proc_posit'].update({fml}) 
+                w.move_formula(fml, 'diamond', 'proc_posit')
 
-                    return(interpretation, False, True, [])
+                return(interpretation, False, True, [])
 
 
                                
@@ -279,7 +383,7 @@ def role_rule_1(interpretation):
                                                   'neg_atoms': set(),
                                                   'double_neg': set(),
                                                   'conjunction': set(),
-                                                  'neg_conjunction': interpretation.TBox_formulas,
+                                                  'neg_conjunction': set(interpretation.TBox_formulas),
                                                   'diamond': set(),
                                                   'neg_diamond': set(),
                                                   'global_desc': set(),
@@ -293,17 +397,17 @@ def role_rule_1(interpretation):
                                                   'new_fml_posit': set(),
                                                   'new_fml_negat': set()})
     
-            new_world._world_name_str = generators.new_world_name(interpretation)
+            new_world._deps = w._label[fml]
            
             #place the formula in the new world
-            relocate_to_new_fml_sets(new_world._formulas, fml.sub2)                
+            relocate_to_new_fml_sets(new_world, fml.sub2, new_world._deps)                
 
             interpretation.add_edge(w, new_world, fml.role)    
 
             #moving concepts ~X, such that ~*E (role) X to the new world
             for box_fml in w._formulas['proc_negat']:
                 if isinstance(box_fml.sub, forms.Diamond) and (box_fml.sub.role == fml.role):
-                    relocate_to_new_fml_sets(new_world._formulas, forms.Negation(box_fml.sub.sub2))
+                    relocate_to_new_fml_sets(new_world, forms.Negation(box_fml.sub.sub2), new_world._deps | w._label[box_fml])
                                              
             del new_world 
            
@@ -317,29 +421,25 @@ def role_rule_1(interpretation):
 # ROLE RULE 2  ----------------------------
 
 
-def role_rule_2(interpretation):
+def role_rule_2(interpretation, task = None):
     """ Function implementing the role rule for "~Ǝr" """
     
     
-    for w in interpretation.worlds():
+    for w in worlds_to_check(interpretation, task):
 
-        fml_set_copy = list(w._formulas['neg_diamond'])
+        fml_set_copy = formulas_to_check(w, task, 'neg_diamond')
 
         for fml in fml_set_copy:        
 
                 #updating the list of concepts X, such that ~*E role X is a concept
-            if fml.sub.role in w._box_subformulas.keys():
-                w._box_subformulas[fml.sub.role].update({fml})
-            else:
-                w._box_subformulas[fml.sub.role] = {fml}
+            w.add_box_subformula(fml.sub.role, fml)
             
             
             #add the formula to all the related worlds                
             for v in interpretation.related_worlds(w, fml.sub.role):
-                relocate_to_new_fml_sets(v._formulas, forms.Negation(fml.sub.sub2))
+                relocate_to_new_fml_sets(v, forms.Negation(fml.sub.sub2), w._label[fml] | v._deps)
 
-            w._formulas['neg_diamond'].remove(fml) 
-            w._formulas['proc_negat'].update({fml})  
+            w.move_formula(fml, 'neg_diamond', 'proc_negat')
                                  
             return(interpretation, False, True, [])
     
@@ -351,12 +451,12 @@ def role_rule_2(interpretation):
 # GLOBAL DESCRIPTION RULE 1  ----------------------------
 
 
-def global_description_rule_1(interpretation):
+def global_description_rule_1(interpretation, task = None):
     """ Function implementing the first rule for global descriptions: i(g,1) """
 
-    for w in interpretation.worlds():
+    for w in worlds_to_check(interpretation, task):
 
-        fml_set_copy = list(w._formulas['global_desc'])
+        fml_set_copy = formulas_to_check(w, task, 'global_desc')
 
         for fml in fml_set_copy:        
 
@@ -364,9 +464,8 @@ def global_description_rule_1(interpretation):
 
             #Option 1 - are both formulas in the description satisfied in some world?
             for v in interpretation.worlds():
-                if {fml.subs[0], fml.subs[1]} <= set.union(*v._formulas.values()):
-                    w._formulas['global_desc'].remove(fml) 
-                    w._formulas['proc_global_desc'].update({fml})  
+                if fml.subs[0] in v._label and fml.subs[1] in v._label:
+                    w.move_formula(fml, 'global_desc', 'proc_global_desc')
                     continue_to_next_formula = True
                     break
 
@@ -379,11 +478,10 @@ def global_description_rule_1(interpretation):
 
             #Option 2 - is the first formula in the description satisfied in some world?                    
             for v in interpretation.worlds():
-                if fml.subs[0] in set.union(*v._formulas.values()):
-                    relocate_to_new_fml_sets(v._formulas, fml.subs[1])
+                if fml.subs[0] in v._label:
+                    relocate_to_new_fml_sets(v, fml.subs[1], w._label[fml] | v._label[fml.subs[0]])
 
-                    w._formulas['global_desc'].remove(fml) 
-                    w._formulas['proc_global_desc'].update({fml})  
+                    w.move_formula(fml, 'global_desc', 'proc_global_desc')
                     
                     return(interpretation, False, True, [])
 
@@ -394,7 +492,7 @@ def global_description_rule_1(interpretation):
                                                   'neg_atoms': set(),
                                                   'double_neg': set(),
                                                   'conjunction': set(),
-                                                  'neg_conjunction': interpretation.TBox_formulas,
+                                                  'neg_conjunction': set(interpretation.TBox_formulas),
                                                   'diamond': set(),
                                                   'neg_diamond': set(),
                                                   'global_desc': set(),
@@ -408,13 +506,12 @@ def global_description_rule_1(interpretation):
                                                   'new_fml_posit': set(),
                                                   'new_fml_negat': set()})
             
-            new_world._world_name_str = generators.new_world_name(interpretation)
+            new_world._deps = w._label[fml]
 
-            relocate_to_new_fml_sets(new_world._formulas, fml.subs[0])
-            relocate_to_new_fml_sets(new_world._formulas, fml.subs[1])
+            relocate_to_new_fml_sets(new_world, fml.subs[0], new_world._deps)
+            relocate_to_new_fml_sets(new_world, fml.subs[1], new_world._deps)
 
-            w._formulas['global_desc'].remove(fml) 
-            w._formulas['proc_global_desc'].update({fml})  
+            w.move_formula(fml, 'global_desc', 'proc_global_desc')
             
             del new_world            
 
@@ -427,49 +524,83 @@ def global_description_rule_1(interpretation):
 # GLOBAL DESCRIPTION RULE 2  ----------------------------
 
 
-def global_description_rule_2(interpretation):
+def global_description_rule_2(interpretation, task = None):
     """ Function implementing the second rule for global descriptions: i(g,2) """
+    return unification(interpretation, task, forms.Description_Global, lambda fml: fml.subs[0])
 
-    forms_checked = set()
-    
-    for w in interpretation.worlds():
-
-        #here we need to iterate over all formulas, to make sure each formula in each world is checked, before "rule not applied" is returned
-        for fml in (w._formulas['global_desc'] | w._formulas['proc_global_desc']):
-        #in case of this rule, we consider both processed and unprocessed formulas, and do not modify any of them in course of applying the rule
-
-            if fml.subs[0] in forms_checked:
-                continue
 
-            worlds_to_be_unified_names = set()
-            worlds_to_be_unified_world_copies = list()
 
-            #create working copies of the worlds to be unified            
-            for v in interpretation.worlds():
-                if fml.subs[0] in set.union(*v._formulas.values()):
-                    worlds_to_be_unified_names.update({v._world_name_str})
-                    worlds_to_be_unified_world_copies.append(v)
-            
-            if len(worlds_to_be_unified_names) < 2:
-                continue #to the next formula - rule not applied
-            elif all([set.union(*z._formulas.values())==set.union(*worlds_to_be_unified_world_copies[0]._formulas.values()) for z in worlds_to_be_unified_world_copies[1:]]):
-                forms_checked.update({fml.subs[0]})
-                continue #to the next formula - rule not applied (all the worlds have the same sets of formulas)
-            else:
-                formulas_sum = set.union(*[set.union(*z._formulas.values()) for z in worlds_to_be_unified_world_copies])
+def unification(interpretation, task, description_type, subject):
+    """ Common part of the second rules for global and local descriptions: all the worlds satisfying the subject C of a 
+    description (iC.D or i.C, satisfied in any world) denote the same individual, so they are merged into one class of 
+    unified worlds (see Interpretation.unify), and the worlds of a class share all their formulas.
 
-                for v in interpretation.worlds():
-                    if v._world_name_str in worlds_to_be_unified_names:
-                        for form in formulas_sum - set.union(*v._formulas.values()):
-                            relocate_to_new_fml_sets(v._formulas, form)
+    The rule is applied to the new formulas of the worlds (the tasks (world, formula) of the event 'label'):
+        - a new description of the given type - the worlds satisfying its subject are unified
+        - a new formula C, which is the subject of a description - the world is unified with the worlds satisfying C
+        - a new formula of a unified world - it is added to the other worlds of its class
+    The labels of the worlds are thus never compared: whether two worlds are already unified is a comparison of the 
+    roots of their classes. The subjects of both kinds of descriptions are stored together, since both rules unify the 
+    worlds satisfying the subject.
 
+    Arguments: 
+        description_type: forms.Description_Global or forms.Description_Local
+        subject: function returning the subject C of a description
+    """
+    if task is None:
+        tasks = [(w, fml) for w in interpretation.worlds() for fml in sorted(w._label, key = hash)]
+    else:
+        tasks = [task]
+
+    for w, fml in tasks:
+        merged = None   #identifier of a world of the class which has been merged with another class
+
+        #a new description - the worlds satisfying its subject (in the order of their identifiers) are unified
+        if isinstance(fml, description_type) and subject(fml) not in interpretation._unification_subjects:
+            subj = subject(fml)
+            subj_worlds = interpretation.worlds_satisfying(subj)
+            interpretation.add_unification_subject(subj, w._label[fml], subj_worlds[0]._id if subj_worlds else None)
+            for v in subj_worlds[1:]:
+                #the unification depends on the description and on the formula C in both unified worlds
+                if interpretation.unify(subj_worlds[0]._id, v._id, w._label[fml] | subj_worlds[0]._label[subj] | v._label[subj]):
+                    merged = v._id
+
+        #a new formula C, which is the subject of a description - the world is unified with the worlds satisfying C
+        if fml in interpretation._unification_subjects:
+            desc_deps, v_id = interpretation._unification_subjects[fml]
+            if v_id is None:
+                interpretation.add_unification_subject(fml, desc_deps, w._id)
+            elif interpretation.unify(v_id, w._id, desc_deps | interpretation.world_by_id(v_id)._label[fml] | w._label[fml]):
+                merged = w._id
+
+        if merged is not None:
+            #all formulas of the merged class are shared by its worlds
+            members, class_deps = interpretation.unified_class(merged)
+            class_worlds = [interpretation.world_by_id(v_id) for v_id in members]
+            formulas_sum = {}
+            for v in class_worlds:
+                for form, deps in v._label.items():
+                    formulas_sum.setdefault(form, deps)
+            for v in class_worlds:
+                for form in [form for form in formulas_sum if form not in v._label]:
+                    relocate_to_new_fml_sets(v, form, class_deps | formulas_sum[form])
+            return(interpretation, False, True, [])
 
-                del worlds_to_be_unified_names
-                del worlds_to_be_unified_world_copies
-                
-                
+        #a new formula of a unified world - it is added to the other worlds of its class (a formula is always added to all 
+        #the worlds of the class at once, so if it is already in the root world of the class, it is shared already or 
+        #it will be shared by the task of the root world)
+        root = interpretation.unified_root(w._id)
+        members, class_deps = interpretation.unified_class(root)
+        if len(members) > 1 and (root == w._id or fml not in interpretation.world_by_id(root)._label):
+            rule_applied = False
+            for v_id in members:
+                v = interpretation.world_by_id(v_id)
+                if fml not in v._label:
+                    relocate_to_new_fml_sets(v, fml, class_deps | w._label[fml])
+                    rule_applied = True
+            if rule_applied:
                 return(interpretation, False, True, [])
-                
+
     return(interpretation, False, False, [])
                     
 
@@ -477,109 +608,102 @@ def global_description_rule_2(interpretation):
 # GLOBAL DESCRIPTION RULE 3  ----------------------------
 
 
-def global_description_rule_3(interpretation):
+def global_description_rule_3(interpretation, task = None):
     """ Function implementing the rule for negated global descriptions: ~i(g) """
 
     
-    for w in interpretation.worlds():
+    for w in worlds_to_check(interpretation, task):
         
         #removing from the set 'neg_global_desc' such formulas ~@ A X that A is an appropriate set (of formulas A such that Option 3 of GD RULE 3 has already been applied to ~@ A X)
         neg_GD_forms_to_remove = {fml for fml in w._formulas['neg_global_desc'] if fml.sub.subs[0] in interpretation._GlDesc_rule3_fml_set}
-        w._formulas['neg_global_desc'].difference_update(neg_GD_forms_to_remove) 
-        w._formulas['proc_negat'].update(neg_GD_forms_to_remove) 
+        for fml in neg_GD_forms_to_remove:
+            w.move_formula(fml, 'neg_global_desc', 'proc_negat')
         del neg_GD_forms_to_remove
 
 
-        for fml in w._formulas['neg_global_desc']:
+        for fml in formulas_to_check(w, task, 'neg_global_desc'):
 
             for v in interpretation.worlds():
-                if forms.Negation(fml.sub.subs[0]) in set.union(*v._formulas.values()) or forms.Negation(fml.sub.subs[1]) in set.union(*v._formulas.values()):
+                if fml.sub.subs[0].negation in v._label or fml.sub.subs[1].negation in v._label:
                     continue #pass to the next world v
                 else:
-                    alt_interpretation1 = deepcopy(interpretation)
-                    alt_interpretation2 = deepcopy(interpretation)
-                    
-                    #1. updating current interpretation --
-                    relocate_to_new_fml_sets(v._formulas, forms.Negation(fml.sub.subs[0]))
+                    w_id = w._id
+                    v_id = v._id
+                    fml_deps = w._label[fml]
 
-
-                    #2. updating the "alternative interpretation 1" --
-                    for w_alt in alt_interpretation1.worlds():
-                        if w_alt._world_name_str == v._world_name_str:
-                            relocate_to_new_fml_sets(w_alt._formulas, forms.Negation(fml.sub.subs[1]))
-           
+                    #options 1 and 2 --
+                    def option_negation(interp, branch, i):
+                        relocate_to_new_fml_sets(interp.world_by_id(v_id), forms.Negation(fml.sub.subs[i]), fml_deps | branch)
            
-                    #3. updating the "alternative interpretation 2" --
            
-                    fresh_atom_str = generators.new_fresh_atom(alt_interpretation2)
-                    parser_tree = forms.parser_DL.parse(fresh_atom_str)
-                    fresh_atom = forms.ToFml().transform(parser_tree)
-
-
-                    #first new world
-                    new_world = alt_interpretation2.add_world({'atoms': set(),
-                                                               'neg_atoms': set(),
-                                                               'double_neg': set(),
-                                                               'conjunction': set(),
-                                                               'neg_conjunction': interpretation.TBox_formulas,
-                                                               'diamond': set(),
-                                                               'neg_diamond': set(),
-                                                               'global_desc': set(),
-                                                               'neg_global_desc': set(),
-                                                               'local_desc': set(),
-                                                               'neg_local_desc': set(),
-                                                               'proc_posit': set(),
-                                                               'proc_negat': set(),
-                                                               'proc_global_desc': set(),
-                                                               'proc_local_desc': set(),
-                                                               'new_fml_posit': set(),
-                                                               'new_fml_negat': set()})
-                    
-                    new_world._world_name_str = generators.new_world_name(alt_interpretation2)
+                    #option 3 --
+                    def option_new_worlds(interp, branch):
+                        deps = fml_deps | branch
+                        fresh_atom_str = interp.new_fresh_atom()
+                        fresh_atom = forms.Atom(fresh_atom_str)   #fresh atoms are built directly, without the parser
+
+
+                        #first new world
+                        new_world = interp.add_world({'atoms': set(),
+                                                      'neg_atoms': set(),
+                                                      'double_neg': set(),
+                                                      'conjunction': set(),
+                                                      'neg_conjunction': set(interp.TBox_formulas),
+                                                      'diamond': set(),
+                                                      'neg_diamond': set(),
+                                                      'global_desc': set(),
+                                                      'neg_global_desc': set(),
+                                                      'local_desc': set(),
+                                                      'neg_local_desc': set(),
+                                                      'proc_posit': set(),
+                                                      'proc_negat': set(),
+                                                      'proc_global_desc': set(),
+                                                      'proc_local_desc': set(),
+                                                      'new_fml_posit': set(),
+                                                      'new_fml_negat': set()})
+                        
+                        new_world._deps = deps
 
-                    relocate_to_new_fml_sets(new_world._formulas, fml.sub.subs[0])
-                    relocate_to_new_fml_sets(new_world._formulas, fresh_atom)
-                    
-                    del new_world    
-                    
+                        relocate_to_new_fml_sets(new_world, fml.sub.subs[0], deps)
+                        relocate_to_new_fml_sets(new_world, fresh_atom, deps)
+                        
+                        del new_world    
+                        
 
-                    #second new world
-                    new_world2 = alt_interpretation2.add_world({'atoms': set(),
-                                                                'neg_atoms': set(),
-                                                                'double_neg': set(),
-                                                                'conjunction': set(),
-                                                                'neg_conjunction': interpretation.TBox_formulas,
-                                                                'diamond': set(),
-                                                                'neg_diamond': set(),
-                                                                'global_desc': set(),
-                                                                'neg_global_desc': set(),
-                                                                'local_desc': set(),
-                                                                'neg_local_desc': set(),
-                                                                'proc_posit': set(),
-                                                                'proc_negat': set(),
-                                                                'proc_global_desc': set(),
-                                                                'proc_local_desc': set(),
-                                                                'new_fml_posit': set(),
-                                                                'new_fml_negat': set()})
-
-                    new_world2._world_name_str = generators.new_world_name(alt_interpretation2)
-
-                    relocate_to_new_fml_sets(new_world2._formulas, fml.sub.subs[0])
-                    relocate_to_new_fml_sets(new_world2._formulas, forms.Negation(fresh_atom))
-                    
-                    del new_world2
-                    
-                    #we mark the orignal formula (negation of GD) as processed in the second alternative interpretation                            
-                    for w_alt2 in alt_interpretation2.worlds():
-                        if w_alt2._world_name_str == w._world_name_str:
-                            w_alt2._formulas['neg_global_desc'].remove(fml) 
-                            w_alt2._formulas['proc_negat'].update({fml}) 
+                        #second new world
+                        new_world2 = interp.add_world({'atoms': set(),
+                                                       'neg_atoms': set(),
+                                                       'double_neg': set(),
+                                                       'conjunction': set(),
+                                                       'neg_conjunction': set(interp.TBox_formulas),
+                                                       'diamond': set(),
+                                                       'neg_diamond': set(),
+                                                       'global_desc': set(),
+                                                       'neg_global_desc': set(),
+                                                       'local_desc': set(),
+                                                       'neg_local_desc': set(),
+                                                       'proc_posit': set(),
+                                                       'proc_negat': set(),
+                                                       'proc_global_desc': set(),
+                                                       'proc_local_desc': set(),
+                                                       'new_fml_posit': set(),
+                                                       'new_fml_negat': set()})
+
+                        new_world2._deps = deps
+
+                        relocate_to_new_fml_sets(new_world2, fml.sub.subs[0], deps)
+                        relocate_to_new_fml_sets(new_world2, forms.Negation(fresh_atom), deps)
+                        
+                        del new_world2
+                        
+                        #we mark the orignal formula (negation of GD) as processed
+                        interp.world_by_id(w_id).move_formula(fml, 'neg_global_desc', 'proc_negat')
 
-                    #updating the set of formulas for which global_description_rule_3 will be blocked for this interpretation (on this branch)
-                    alt_interpretation2._GlDesc_rule3_fml_set.update({fml.sub.subs[0]})                            
+                        #updating the set of formulas for which global_description_rule_3 will be blocked for this interpretation (on this branch)
+                        interp.register('_GlDesc_rule3_fml_set', fml.sub.subs[0])
 
             
-                return(interpretation, False, True, [alt_interpretation1, alt_interpretation2])
+                    return(interpretation, False, True, [lambda interp, branch: option_negation(interp, branch, 0), lambda interp, branch: option_negation(interp, branch, 1), option_new_worlds])
 
     return(interpretation, False, False, [])
 
@@ -591,29 +715,21 @@ def global_description_rule_3(interpretation):
 
 
 
-def global_description_cut_rule(interpretation):
+def global_description_cut_rule(interpretation, task = None):
     """ Function implementing the cut rule for global descriptions: cut(g,i) """
     
-    for w in interpretation.worlds():
+    for w in worlds_to_check(interpretation, task):
  
-        for fml in (w._formulas['global_desc'] | w._formulas['proc_global_desc']):   
+        for fml in formulas_to_check(w, task, 'global_desc', 'proc_global_desc'):   
                 
             for v in interpretation.worlds():
-                if (fml.subs[0] not in set.union(*v._formulas.values())) and (forms.Negation(fml.subs[0]) not in set.union(*v._formulas.values())):
+                if (fml.subs[0] not in v._label) and (fml.subs[0].negation not in v._label):
                     
-                    alt_interpretation = deepcopy(interpretation)
-                    
-                    #updating current interpretation
-                    relocate_to_new_fml_sets(v._formulas, fml.subs[0])
-
-                
-                    #updating the "alternative interpretation"
-                    for w_alt in alt_interpretation.worlds():
-                        if w_alt._world_name_str == v._world_name_str:
-
-                            relocate_to_new_fml_sets(w_alt._formulas, forms.Negation(fml.subs[0]))
+                    v_id = v._id
+                    fml_deps = w._label[fml]
+                    cut_fmls = (fml.subs[0], forms.Negation(fml.subs[0]))
 
-                    return(interpretation, False, True, [alt_interpretation])
+                    return(interpretation, False, True, [branching_option(v_id, (x,), fml_deps) for x in cut_fmls])
 
     return(interpretation, False, False, [])
 
@@ -624,18 +740,17 @@ def global_description_cut_rule(interpretation):
 # LOCAL DESCRIPTION RULE 1  ----------------------------
 
 
-def local_description_rule_1(interpretation):
+def local_description_rule_1(interpretation, task = None):
     """ Function implementing the first rule for local descriptions: i(l,1) """
 
-    for w in interpretation.worlds():
+    for w in worlds_to_check(interpretation, task):
 
-        fml_set_copy = list(w._formulas['local_desc'])
+        fml_set_copy = formulas_to_check(w, task, 'local_desc')
 
         for fml in fml_set_copy:        
 
-            relocate_to_new_fml_sets(w._formulas, fml.sub)
-            w._formulas['local_desc'].remove(fml) 
-            w._formulas['proc_local_desc'].update({fml})  
+            relocate_to_new_fml_sets(w, fml.sub, w._label[fml])
+            w.move_formula(fml, 'local_desc', 'proc_local_desc')
             
             return(interpretation, False, True, [])
             
@@ -646,43 +761,9 @@ def local_description_rule_1(interpretation):
 # LOCAL DESCRIPTION RULE 2  ----------------------------
 
 
-def local_description_rule_2(interpretation):
+def local_description_rule_2(interpretation, task = None):
     """ Function implementing the second rule for local descriptions: i(l,1) """
-    
-    for w in interpretation.worlds():
-
-        #here we need to iterate over all formulas, to make sure each formula in each world is checked, before "rule not applied" is returned
-        for fml in (w._formulas['local_desc'] | w._formulas['proc_local_desc']):
-        #in case of this rule, we consider both processed and unprocessed formulas, and do not modify any of them in course of applying the rule
-
-            worlds_to_be_unified_names = set()
-            worlds_to_be_unified_world_copies = list()
-
-            #create working copies of the worlds to be unified            
-            for v in interpretation.worlds():
-                if fml.sub in set.union(*v._formulas.values()):
-                    worlds_to_be_unified_names.update({v._world_name_str})
-                    worlds_to_be_unified_world_copies.append(v)
-            
-            if len(worlds_to_be_unified_names) < 2:
-                continue #to the next formula - rule not applied
-            elif all([set.union(*z._formulas.values())==set.union(*worlds_to_be_unified_world_copies[0]._formulas.values()) for z in worlds_to_be_unified_world_copies[1:]]):
-                continue #to the next formula - rule not applied (all the worlds have the same sets of formulas)
-            else:
-                formulas_sum = set.union(*[set.union(*z._formulas.values()) for z in worlds_to_be_unified_world_copies])
-
-                for v in interpretation.worlds():
-                    if v._world_name_str in worlds_to_be_unified_names:
-                        for form in formulas_sum - set.union(*v._formulas.values()):
-                            relocate_to_new_fml_sets(v._formulas, form)
-
-
-                del worlds_to_be_unified_names
-                del worlds_to_be_unified_world_copies
-                
-                return(interpretation, False, True, [])
-                
-    return(interpretation, False, False, [])
+    return unification(interpretation, task, forms.Description_Local, lambda fml: fml.sub)
                     
 
 
@@ -690,83 +771,78 @@ def local_description_rule_2(interpretation):
 # LOCAL DESCRIPTION RULE 3  ----------------------------
 
 
-def local_description_rule_3(interpretation):
+def local_description_rule_3(interpretation, task = None):
     """ Function implementing the rule for negated local descriptions: ~i(l) """
     
-    for w in interpretation.worlds():
+    for w in worlds_to_check(interpretation, task):
 
-        fml_set_copy = list(w._formulas['neg_local_desc'])
+        fml_set_copy = formulas_to_check(w, task, 'neg_local_desc')
 
         for fml in fml_set_copy:        
             
-            if forms.Negation(fml.sub.sub) in set.union(*w._formulas.values()):
-                w._formulas['neg_local_desc'].remove(fml) 
-                w._formulas['proc_negat'].update({fml})
+            if fml.sub.sub.negation in w._label:
+                w.move_formula(fml, 'neg_local_desc', 'proc_negat')
                 continue 
 
-            #creating the alternative interpetation for Option 2
-            alt_interpretation = deepcopy(interpretation)
+            w_id = w._id
+            fml_deps = w._label[fml]
 
             #Option 1 - for i.C, add ~C
-            #updating the current interpretation            
-            relocate_to_new_fml_sets(w._formulas, forms.Negation(fml.sub.sub)) 
-            w._formulas['neg_local_desc'].remove(fml) 
-            w._formulas['proc_negat'].update({fml})
+            def option_1(interp, branch):
+                w_opt = interp.world_by_id(w_id)
+                relocate_to_new_fml_sets(w_opt, forms.Negation(fml.sub.sub), fml_deps | branch) 
+                w_opt.move_formula(fml, 'neg_local_desc', 'proc_negat')
 
             #Option 2 
-            if fml.sub.sub in alt_interpretation._LocDesc_rule3_list[0]:
-                for w_alt in alt_interpretation.worlds():
-                    if w_alt._world_name_str == w._world_name_str:
-                        relocate_to_new_fml_sets(w._formulas, alt_interpretation._LocDesc_rule3_list[1][alt_interpretation._LocDesc_rule3_list[0].index(fml.sub.sub)])
-                        w_alt._formulas['neg_local_desc'].remove(fml) 
-                        w_alt._formulas['proc_negat'].update({fml})
-                    return(interpretation, False, True, [alt_interpretation])
+            def option_2(interp, branch):
+                w_opt = interp.world_by_id(w_id)
+                deps = fml_deps | branch
 
-            else:
-                fresh_atom_str = generators.new_fresh_atom(alt_interpretation)
+                #the fresh atom introduced for C on this branch is reused
+                if fml.sub.sub in interp._LocDesc_rule3_list[0]:
+                    relocate_to_new_fml_sets(w_opt, interp._LocDesc_rule3_list[1][interp._LocDesc_rule3_list[0].index(fml.sub.sub)], deps)
+                    w_opt.move_formula(fml, 'neg_local_desc', 'proc_negat')
+                    return
+
+                fresh_atom_str = interp.new_fresh_atom()
         
-                parser_tree = forms.parser_DL.parse(fresh_atom_str)
-                fresh_atom = forms.ToFml().transform(parser_tree)
+                fresh_atom = forms.Atom(fresh_atom_str)   #fresh atoms are built directly, without the parser
 
-                for w_alt in alt_interpretation.worlds():
-                    if w_alt._world_name_str == w._world_name_str:
-                        relocate_to_new_fml_sets(w_alt._formulas, fresh_atom)
-                        w_alt._formulas['neg_local_desc'].remove(fml) 
-                        w_alt._formulas['proc_negat'].update({fml})
+                relocate_to_new_fml_sets(w_opt, fresh_atom, deps)
+                w_opt.move_formula(fml, 'neg_local_desc', 'proc_negat')
 
 
                 #first new world
-                new_world = alt_interpretation.add_world({'atoms': set(),
-                                                           'neg_atoms': set(),
-                                                           'double_neg': set(),
-                                                           'conjunction': set(),
-                                                           'neg_conjunction': interpretation.TBox_formulas,
-                                                           'diamond': set(),
-                                                           'neg_diamond': set(),
-                                                           'global_desc': set(),
-                                                           'neg_global_desc': set(),
-                                                           'local_desc': set(),
-                                                           'neg_local_desc': set(),
-                                                           'proc_posit': set(),
-                                                           'proc_negat': set(),
-                                                           'proc_global_desc': set(),
-                                                           'proc_local_desc': set(),
-                                                           'new_fml_posit': set(),
-                                                           'new_fml_negat': set()})
+                new_world = interp.add_world({'atoms': set(),
+                                              'neg_atoms': set(),
+                                              'double_neg': set(),
+                                              'conjunction': set(),
+                                              'neg_conjunction': set(interp.TBox_formulas),
+                                              'diamond': set(),
+                                              'neg_diamond': set(),
+                                              'global_desc': set(),
+                                              'neg_global_desc': set(),
+                                              'local_desc': set(),
+                                              'neg_local_desc': set(),
+                                              'proc_posit': set(),
+                                              'proc_negat': set(),
+                                              'proc_global_desc': set(),
+                                              'proc_local_desc': set(),
+                                              'new_fml_posit': set(),
+                                              'new_fml_negat': set()})
                 
-                new_world._world_name_str = generators.new_world_name(alt_interpretation)
+                new_world._deps = deps
 
-                relocate_to_new_fml_sets(new_world._formulas, fml.sub.sub)
-                relocate_to_new_fml_sets(new_world._formulas, forms.Negation(fresh_atom))
+                relocate_to_new_fml_sets(new_world, fml.sub.sub, deps)
+                relocate_to_new_fml_sets(new_world, forms.Negation(fresh_atom), deps)
                 
                 
                 del new_world    
 
                 #updating the special list for 
-                alt_interpretation._LocDesc_rule3_list[0].append(fml.sub.sub)
-                alt_interpretation._LocDesc_rule3_list[1].append(fresh_atom)
+                interp.add_LocDesc_rule3(fml.sub.sub, fresh_atom)
 
-                return(interpretation, False, True, [alt_interpretation]);
+            return(interpretation, False, True, [option_1, option_2])
 
     return(interpretation, False, False, [])
 
@@ -776,29 +852,55 @@ def local_description_rule_3(interpretation):
 # LOCAL DESCRIPTION CUT RULE  ----------------------------
 
 
-def local_description_cut_rule(interpretation):
+def local_description_cut_rule(interpretation, task = None):
     """ Function implementing the cut rule for local descriptions: cut(l,i) """
     
-    for w in interpretation.worlds():
+    for w in worlds_to_check(interpretation, task):
  
-        for fml in (w._formulas['local_desc'] | w._formulas['proc_local_desc']):   
+        for fml in formulas_to_check(w, task, 'local_desc', 'proc_local_desc'):   
                 
             for v in interpretation.worlds():
-                if (fml.sub not in set.union(*v._formulas.values())) and (forms.Negation(fml.sub) not in set.union(*v._formulas.values())):
+                if (fml.sub not in v._label) and (fml.sub.negation not in v._label):
                     
-                    alt_interpretation = deepcopy(interpretation)
-                    
-                    #updating current interpretation
-                    relocate_to_new_fml_sets(v._formulas, fml.sub)
+                    v_id = v._id
+                    fml_deps = w._label[fml]
+                    cut_fmls = (fml.sub, forms.Negation(fml.sub))
+
+                    return(interpretation, False, True, [branching_option(v_id, (x,), fml_deps) for x in cut_fmls])
 
-                    #updating the "alternative interpretation"
-                    for w_alt in alt_interpretation.worlds():
-                        if w_alt._world_name_str == v._world_name_str:
 
-                            relocate_to_new_fml_sets(w_alt._formulas, forms.Negation(fml.sub))
+    return(interpretation, False, False, [])
 
-                    return(interpretation, False, True, [alt_interpretation])
 
 
-    return(interpretation, False, False, [])
 
+#RULE TRIGGERS -------------------------------------------------
+
+"""
+Events for which each rule is registered in the agenda of the tableau (see the script "agenda"): when a formula is 
+placed in one of the given sets in some world, or a given event happens ('box', 'world', 'label'), a task for the 
+rule is added to the agenda. A rule can be applied only after one of those events happened.
+"""
+
+triggers = {clash_rule: ('new_fml_posit', 'new_fml_negat'),
+            double_neg_rule: ('double_neg',),
+            conjunction_rule: ('conjunction',),
+            lazy_unfolding_rule: ('atoms',),
+            role_rule_2: ('neg_diamond',),
+            negated_conjunction_propagation_rule: ('neg_conjunction', 'new_fml_posit', 'new_fml_negat'),
+            negated_conjunction_rule: ('neg_conjunction',),
+            semantic_negated_conjunction_rule: ('neg_conjunction',),
+            local_description_rule_1: ('local_desc',),
+            local_description_rule_2: ('label',),
+            local_description_rule_3: ('neg_local_desc',),
+            local_description_cut_rule: ('local_desc', 'world'),
+            global_description_rule_1: ('global_desc',),
+            global_description_rule_2: ('label',),
+            global_description_rule_3: ('neg_global_desc', 'world'),
+            global_description_cut_rule: ('global_desc', 'world'),
+            role_rule_1: ('diamond', 'box')}
+
+
+
+#branching rules whose next premise is chosen by the branching heuristic of the tableau (see the script "heuristics")
+heuristic_rules = (negated_conjunction_rule, semantic_negated_conjunction_rule, global_description_rule_3, local_description_rule_3)
@@ -0,0 +1,151 @@
+import forms
+
+
+"""
+Simplification of concepts before building the tableau: a concept is rewritten bottom-up into an equivalent (hence also
+equisatisfiable) concept, which is never larger, using the following rules:
+    ¬¬C  =>  C
+    nested conjunctions are flattened, and repeated conjuncts are removed:  C Π (D Π C)  =>  C Π D
+    a conjunction with conjuncts C and ¬C (contradiction) is ⊥
+    a conjunction with a conjunct ⊥ is ⊥, and conjuncts ⊤ are removed
+    Ǝ r ⊥, i.⊥, i ⊥.C, i C.⊥  =>  ⊥
+    ⊥ -> C, C -> ⊤  =>  ⊤
+Since the language has no constants, ⊥ is represented by the concept A Π ¬A, and ⊤ by ¬(A Π ¬A), for an atom A.
+Contradictions are thus closed by the tableau after applying a single rule, and tautologies (e.g. ¬(C Π ¬C)) need no
+branching at all.
+"""
+
+
+def simplify(fml):
+    """Return the simplified formula (see above).
+
+    Arguments: fml - a Formula object
+
+    Output: a Formula object equivalent to fml
+    """
+    simplified = {}   #simplified subformulas (formulas are interned, so each distinct subformula is simplified once)
+
+    #bottom-up pass over the subformulas (without recursion, since formulas may be deep)
+    stack = [fml]
+    while stack:
+        f = stack[-1]
+        if f in simplified:
+            stack.pop()
+            continue
+        missing = [sub for sub in f._subformulas() if sub not in simplified]
+        if missing:
+            stack.extend(missing)
+            continue
+        stack.pop()
+        simplified[f] = _simplify_node(f, [simplified[sub] for sub in f._subformulas()])
+
+    return simplified[fml]
+
+
+def formula_size(fml) -> int:
+    """Return the size of the formula: the number of symbols (atoms and connectives), excluding parentheses."""
+    sizes = {}
+    stack = [fml]
+    while stack:
+        f = stack[-1]
+        if f in sizes:
+            stack.pop()
+            continue
+        missing = [sub for sub in f._subformulas() if sub not in sizes]
+        if missing:
+            stack.extend(missing)
+            continue
+        stack.pop()
+        sizes[f] = 1 + sum(sizes[sub] for sub in f._subformulas())
+    return sizes[fml]
+
+
+
+#AUXILIARY FUNCTIONS-----------------------
+
+def _is_false(fml) -> bool:
+    """Check if the formula is the representation of ⊥: A Π ¬A (or ¬A Π A)."""
+    return isinstance(fml, forms.Conjunction) and fml.subs[1] is fml.subs[0].complement
+
+
+def _is_true(fml) -> bool:
+    """Check if the formula is the representation of ⊤: ¬(A Π ¬A)."""
+    return isinstance(fml, forms.Negation) and _is_false(fml.sub)
+
+
+def _false(fml):
+    """Return the representation of ⊥ built from the first atom of the formula."""
+    atom = forms.Atom(fml.atom_symbols[0])
+    return forms.Conjunction(atom, forms.Negation(atom))
+
+
+def _conjuncts(fml) -> list:
+    """Return the list of conjuncts of a (simplified) formula, in the order from left to right."""
+    conjuncts = []
+    stack = [fml]
+    while stack:
+        f = stack.pop()
+        if isinstance(f, forms.Conjunction):
+            stack.append(f.subs[1])
+            stack.append(f.subs[0])
+        else:
+            conjuncts.append(f)
+    return conjuncts
+
+
+def _simplify_node(fml, subs: list):
+    """Return the simplified formula, given its simplified immediate subformulas."""
+
+    if isinstance(fml, forms.Atom):
+        return fml
+
+    if isinstance(fml, forms.Negation):
+        if isinstance(subs[0], forms.Negation): #double negation (including ¬⊤ => ⊥)
+            return subs[0].sub
+        return forms.Negation(subs[0])
+
+    if isinstance(fml, forms.Diamond):
+        if _is_false(subs[0]):
+            return subs[0]
+        return forms.Diamond(fml.role, subs[0])
+
+    if isinstance(fml, forms.Description_Local):
+        if _is_false(subs[0]):
+            return subs[0]
+        return forms.Description_Local(subs[0])
+
+    if isinstance(fml, forms.Description_Global):
+        for sub in subs:
+            if _is_false(sub):
+                return sub
+        return forms.Description_Global(*subs)
+
+    if isinstance(fml, forms.Conditional):
+        if _is_false(subs[0]) or _is_true(subs[1]):
+            return forms.Negation(_false(fml))
+        return forms.Conditional(*subs)
+
+    #conjunction: flattening, removing repeated conjuncts and ⊤, looking for contradictions
+    conjuncts = {}   #a dictionary is used as an insertion-ordered set
+    conjuncts_count = 0
+    for sub in subs:
+        if _is_false(sub):
+            return sub
+        for conjunct in _conjuncts(sub):
+            conjuncts_count += 1
+            if conjunct.complement in conjuncts:
+                return forms.Conjunction(conjunct.complement, conjunct) if isinstance(conjunct, forms.Negation) else forms.Conjunction(conjunct, conjunct.complement)
+            if not _is_true(conjunct):
+                conjuncts[conjunct] = None
+
+    if not conjuncts: #all conjuncts are ⊤
+        return forms.Negation(_false(fml))
+
+    if len(conjuncts) == conjuncts_count: #no conjunct was removed - the structure of the conjunction is kept
+        return forms.Conjunction(*subs)
+
+    conjuncts = list(conjuncts)
+    new_fml = conjuncts[0]
+    for conjunct in conjuncts[1:]:
+        new_fml = forms.Conjunction(new_fml, conjunct)
+    return new_fml
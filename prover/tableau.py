@@ -1,10 +1,26 @@
 import forms
 import rules
 import interpretation
+from agenda import Agenda
+from heuristics import HEURISTICS
+from result import TableauResult, Model
+from simplify import simplify as simplify_formula, formula_size
 
+import os
 import re
 import time
+import queue
+import multiprocessing
 from copy import deepcopy
+from itertools import count
+
+try:
+    import resource   #not available on Windows - the memory is then read only from /proc (Linux)
+except ImportError:
+    resource = None
+
+#number of iterations of the tableau between the checks of the budgets (see DL_Tableau._explore)
+CHECK_INTERVAL = 32
 
 
 class DL_Tableau:
@@ -15,7 +31,9 @@ class DL_Tableau:
                  concept = None,
                  ABox = None, 
                  RBox = None,
-                 TBox = None):
+                 TBox = None,
+                 simplify = False,
+                 absorption = True):
         
         self.interpretation = interpretation.Interpretation()  #we initialize the interpretation object
         world_names_str = set()   #set of strings containing world names - a working variable
@@ -41,14 +59,12 @@ class DL_Tableau:
 
                 #parsing    
                 if isinstance(formulas, str):
-                    parser_tree = forms.parser_DL.parse(formulas)
-                    fml_parsed = forms.ToFml().transform(parser_tree)
+                    fml_parsed = forms.parse(formulas)
                     fmls_parsed = [fml_parsed]
                 elif isinstance(formulas, list):
                     fmls_parsed = []
                     for fml in formulas:
-                        parser_tree = forms.parser_DL.parse(fml)
-                        fml_parsed = forms.ToFml().transform(parser_tree)
+                        fml_parsed = forms.parse(fml)
                         fmls_parsed.append(fml_parsed)
                 locals()[world] = x = self.interpretation.add_world(fmls_parsed)
                 x._world_name_str = world
@@ -87,8 +103,7 @@ class DL_Tableau:
                         for i in (0,1):
                             if not pair[i] in world_names_str: #check if the world has already been created in ABox
                                 if bool(re.match(r"i.[A-Z]\w*", pair[i])): #if the world is a local description in the form of the world name, we automatically pass the local description formula to the formula list
-                                    parser_tree = forms.parser_DL.parse(pair[i])
-                                    fml_parsed = forms.ToFml().transform(parser_tree)
+                                    fml_parsed = forms.parse(pair[i])
                                     locals()[pair[i]] = x = self.interpretation.add_world([fml_parsed]) 
                                 else:
                                     locals()[pair[i]] = x = self.interpretation.add_world([])
@@ -105,14 +120,12 @@ class DL_Tableau:
         if concept == None:
             pass
         elif isinstance(concept, str):
-            parser_tree = forms.parser_DL.parse(concept)
-            fml_parsed = forms.ToFml().transform(parser_tree)
+            fml_parsed = forms.parse(concept)
             fmls_parsed = [fml_parsed]
         elif isinstance(concept, list):
             fmls_parsed = []
             for fml in concept:
-                parser_tree = forms.parser_DL.parse(fml)
-                fml_parsed = forms.ToFml().transform(parser_tree)
+                fml_parsed = forms.parse(fml)
                 fmls_parsed.append(fml_parsed)
         else:
             raise TypeError("Please insert a correctly built concept or list of concepts in the argument 'concept'")
@@ -138,29 +151,46 @@ class DL_Tableau:
         
         
             
+        #optional simplification of the concepts of all individuals (see the script "simplify"); the TBox is not simplified
+        #(the total sizes of the concepts before and after the simplification are 0 if the concepts are not simplified)
+        self.size_before_simplification = self.size_after_simplification = 0
+        if simplify:
+            for w in self.interpretation.worlds():
+                self.size_before_simplification += sum(formula_size(fml) for fml in w._formulas)
+                w._formulas = [simplify_formula(fml) for fml in w._formulas]
+                self.size_after_simplification += sum(formula_size(fml) for fml in w._formulas)
+        
+        
+            
         #4. TBox argument  --
         
         if TBox == None:
             pass
         else:
             if isinstance(TBox, str):
-                parser_tree = forms.parser_DL.parse(TBox)
-                fml_parsed = forms.ToFml().transform(parser_tree)
+                fml_parsed = forms.parse(TBox)
                 if not isinstance(fml_parsed, forms.Conditional): 
                     raise TypeError("Please enter only subsumptions in the TBox!")
                 fmls_parsed = [fml_parsed]
             elif isinstance(TBox, list):
                 fmls_parsed = []
                 for fml in TBox:
-                    parser_tree = forms.parser_DL.parse(fml)
-                    fml_parsed = forms.ToFml().transform(parser_tree)
+                    fml_parsed = forms.parse(fml)
                     if not isinstance(fml_parsed, forms.Conditional):#ERROR!!!!!
                         print("Please enter only conditionals in the TBox!")                    
                     fmls_parsed.append(fml_parsed)
             else:
                 print("Please insert a subsumption or a list of subsumptions in the TBox")
                     
-            #we're applying the TBox rule - changing implications to negation of conjunction
+            #absorption: the axioms A -> D with an atom A on the left-hand side are not placed in the individuals - 
+            #the concept D is added only to the individuals in which A occurs (see rules.lazy_unfolding_rule)
+            if absorption:
+                for fml in fmls_parsed:
+                    if isinstance(fml.subs[0], forms.Atom):
+                        self.interpretation.TBox_absorbed.setdefault(fml.subs[0], []).append(fml.subs[1])
+                fmls_parsed = [fml for fml in fmls_parsed if not isinstance(fml.subs[0], forms.Atom)]
+
+            #we're applying the TBox rule to the remaining (general) axioms - changing implications to negation of conjunction
             fmls_parsed = [forms.Negation(forms.Conjunction(fml.subs[0], forms.Negation(fml.subs[1]))) for fml in fmls_parsed]
                 
             #adding the parsed formulas to all the worlds
@@ -172,14 +202,16 @@ class DL_Tableau:
                 self.w0._world_name_str = "w0"
                 world_names_str.update({"w0"})           
 
-            self.interpretation.TBox_formulas = set(fmls_parsed)  #saving the TBox (parsed and converted to neg. conjuction) formulas for later (will be placed in every newly created world)
+            self.interpretation.TBox_formulas = set(fmls_parsed)  #saving the general TBox (parsed and converted to neg. conjuction) formulas for later (a copy of them will be placed in every newly created world)
             
         #store the world names in an attribute of the interpretation
         self.interpretation._world_names_str = world_names_str
 
 
-        #creating a set of all atom symbols occurring in the interpretation        
-        self.interpretation._all_atoms_in_interpretation = set()
+        #creating a set of all atom symbols occurring in the interpretation (the fresh atoms introduced by the rules must be different from them)
+        input_fmls = [fml for w in self.interpretation.worlds() for fml in w._formulas] + list(self.interpretation.TBox_absorbed)
+        input_fmls += [fml for fmls in self.interpretation.TBox_absorbed.values() for fml in fmls]
+        self.interpretation._all_atoms_in_interpretation = frozenset(atom for fml in input_fmls for atom in fml.atom_symbols)
 
         #keeping the initial interpretation (before applying any rules)
         self.initial_interpretation = deepcopy(self.interpretation)  
@@ -191,29 +223,65 @@ class DL_Tableau:
         #5. Solver - we build the tableau ----------------------------------
         #this is the main function to apply on the DL_Tableau object
 
-    def build_tableau(self):
+    def build_tableau(self, backtracking = 'copy', backjumping = False, semantic_branching = False, heuristic = 'oldest', workers = None, time_limit = 12, max_rules = None, max_worlds = None, max_frontier = None, max_memory = None, verbose = False):
         """Build the tableau by applying the rules from the script "rules".
         
-        Argument: the tableau object
+        Arguments: 
+            the tableau object
+            backtracking: the way of exploring the branches of the tableau:
+                'copy' - for each option of a branching rule, a copy of the interpretation is created when the rule is applied
+                'trail' - the options not taken yet are stored in a decision log, together with the position on the trail 
+                    of changes of the interpretation; when a branch is closed, the interpretation is restored by undoing 
+                    the changes recorded on the trail, and the next option is applied (only one interpretation is kept)
+            backjumping: if True, each formula carries the set of branching points it depends on, and when a branch is 
+                closed, the tableau jumps back to the latest branching point on which the clash depends - the remaining 
+                options of the later branching points are not explored (they are counted in the attribute "pruned_branches_count"); 
+                if False, the options are explored in the chronological order
+            semantic_branching: if True, the rule for negated conjunctions ~(C & D) uses semantic branching - its options are ~C 
+                and (C, ~D), so the two branches never explore the same models; if False, the options are ~C and ~D
+            heuristic: the branching heuristic, which chooses the next negated conjunction or negated description to branch 
+                on (see the script "heuristics"): 'oldest', 'smallest' or 'moms'
+            workers: number of processes exploring the branches of the tableau in parallel (see _explore_parallel); 
+                None or 1 - the tableau is built in the current process. The parallel mode requires backtracking = 'copy'
+            time_limit, max_rules, max_worlds, max_frontier, max_memory: budgets of building the tableau; when one of them is 
+                exceeded, building the tableau is stopped and the formula is a time-out (the name of the budget - 'time', 
+                'rules', 'worlds', 'frontier' or 'memory' - is stored in the attribute "exceeded_budget"):
+                time_limit - time (in seconds, measured with a monotonic clock)
+                max_rules - number of applied rules
+                max_worlds - number of worlds (individuals) in the interpretation
+                max_frontier - number of branches waiting to be explored (options not taken yet of the branching points)
+                max_memory - memory (in megabytes) used by the process (approximately - the resident set size)
+                None - no limit. In the parallel mode, the budgets other than time apply to each worker separately
+            verbose: if True, the interpretation (see the class Model in the script "result") and the information about 
+                the satisfiability are printed
         
-        Output: a tuple consisting of four objects:
+        Output: a TableauResult object (see the script "result"), which is a tuple consisting of four objects:
             [0]: True, if the formula is a time-out, False otherwise
             [1]: True, if the formula is satisfiable, False otherwise
             [2]: Number of closed branches
             [3]: Number of applied rules
+        and has the other attributes: exceeded_budget, pruned_branches_count and model (a view of the interpretation)
         """
         
 
 
-        #initializing a list of all "alternative" interpretations to be explored on branches of the tableau         
-        alternative_interpretations = []
-                
-        #list of rules to applied; the rules will be applied in the order defined in this list
+        if backtracking not in ('copy', 'trail'):
+            raise ValueError("The argument 'backtracking' should be either 'copy' or 'trail'")
+
+        if workers is not None and workers > 1 and backtracking != 'copy':
+            raise ValueError("The branches can be explored in parallel only in the backtracking mode 'copy'")
+
+        if heuristic not in HEURISTICS:
+            raise ValueError(f"Unknown branching heuristic {heuristic!r}; available heuristics: {', '.join(HEURISTICS)}")
+
+        #list of rules to applied; the order of rules in this list is the priority order of applying them
         rules_to_apply = [rules.clash_rule,
                           rules.double_neg_rule,
                           rules.conjunction_rule,
+                          rules.lazy_unfolding_rule,
                           rules.role_rule_2,
-                          rules.negated_conjunction_rule,
+                          rules.negated_conjunction_propagation_rule,
+                          rules.semantic_negated_conjunction_rule if semantic_branching else rules.negated_conjunction_rule,
                           rules.local_description_rule_1,
                           rules.local_description_rule_2,
                           rules.local_description_rule_3,
@@ -226,7 +294,6 @@ class DL_Tableau:
         
         rules_to_apply = tuple(rules_to_apply)
 
-        no_rules_to_apply = len(rules_to_apply)
         
         #initializing the counter of applied rules
         self.no_rules_applied = 0 
@@ -236,6 +303,12 @@ class DL_Tableau:
 
         #initializing the counter of closed branches of the tableau (in which an inconsistency has been found)        
         self.closed_branches_count = 0
+
+        #initializing the counter of branches that were not explored, as a result of backjumping
+        self.pruned_branches_count = 0
+
+        #initializing the name of the budget which was exceeded (if the formula is a time-out)
+        self.exceeded_budget = None
         
         #division of formulas in the formula list in each world of the interpretation into sets of subtypes of formulas
         #note - the attribute "_formulas" of each world will be a dictionary, composed of sets of formulas as values from now on (not a list, as it was the case in the input)
@@ -250,103 +323,276 @@ class DL_Tableau:
                 else:
                     new_fml_posit.update({fml})                        
 
-            w._formulas = {'atoms': set(),
-                           'neg_atoms': set(),
-                           'double_neg': set(),
-                           'conjunction': set(),
-                           'neg_conjunction': set(),
-                           'diamond': set(),
-                           'neg_diamond': set(),
-                           'global_desc': set(),
-                           'neg_global_desc': set(),
-                           'local_desc': set(),
-                           'neg_local_desc': set(),
-                           'proc_posit': set(),
-                           'proc_negat': set(),
-                           'proc_global_desc': set(),
-                           'proc_local_desc': set(),
-                           'new_fml_posit': new_fml_posit,
-                           'new_fml_negat': new_fml_negat}
+            w.set_formula_sets({'atoms': set(),
+                                'neg_atoms': set(),
+                                'double_neg': set(),
+                                'conjunction': set(),
+                                'neg_conjunction': set(),
+                                'diamond': set(),
+                                'neg_diamond': set(),
+                                'global_desc': set(),
+                                'neg_global_desc': set(),
+                                'local_desc': set(),
+                                'neg_local_desc': set(),
+                                'proc_posit': set(),
+                                'proc_negat': set(),
+                                'proc_global_desc': set(),
+                                'proc_local_desc': set(),
+                                'new_fml_posit': new_fml_posit,
+                                'new_fml_negat': new_fml_negat})
 
             del new_fml_negat, new_fml_posit
 
-        #start measuring the time in order to stop proceeding if the prover works too long (if a given time litmit has been crossed; the limit is given below in the while loop)
-        start_time = time.time()
+        #the budgets of building the tableau; the time is measured in order to stop proceeding if the prover works too long (if the time limit "time_limit" has been crossed)
+        budgets = {'time': None if time_limit is None else time.monotonic() + time_limit,
+                   'rules': max_rules,
+                   'worlds': max_worlds,
+                   'frontier': max_frontier,
+                   'memory': max_memory}
+
+        if workers is None or workers <= 1:
+            if backtracking == 'trail':
+                self.interpretation.start_trail()
+            self._explore(rules_to_apply, backtracking, backjumping, heuristic, budgets)
+        else:
+            self._explore_parallel(rules_to_apply, backjumping, heuristic, workers, budgets)
 
-        #initialize the iterator of rules
-        rules_iterator = 0
 
 
-        while rules_iterator < no_rules_to_apply:
+        result = TableauResult(self.time_out, self.is_satisfiable, self.closed_branches_count, self.no_rules_applied,
+                               self.exceeded_budget, self.pruned_branches_count, Model(self.interpretation))
 
-            #here we set the time limit; if it is exceeded, formula is considered a time-out 
-            if time.time() - start_time > 12:
-                self.time_out = True
-                break
+        #PRINT OUT OF THE INTERPRETATION (only on request - printing large interpretations takes more time than building the tableau)
+        #note - the interpretation should not be considered as a proper model! 
+        if verbose:
+            print(result.model)
+            print(result.status())
             
-            #reset the iterator after any rule has been applied
-            rules_iterator = 0
+        return result
+    
+
+
+    def _explore(self, rules_to_apply, backtracking, backjumping, heuristic, budgets, snapshot = None, branch_ids = None, idle_workers = None, donations = None):
+        """Apply the rules to the interpretation of the tableau (and to the interpretations on new branches), until the 
+        satisfiability status is known or a budget is exceeded. The results are stored in the attributes of the tableau.
 
-            for rule in rules_to_apply:  #iterate over the rules 
+        Arguments (see build_tableau for the other ones):
+            budgets: the dictionary of budgets (see build_tableau; 'time' - the time at which building the tableau is stopped)
+            snapshot: snapshot of the agenda for the interpretation (see Agenda.snapshot); None - the tasks for the whole interpretation are added
+            branch_ids: iterator over the identifiers of the branching points; None - they are counted from 1
+            idle_workers, donations: used in the parallel mode (see _explore_parallel) - the number of idle worker processes 
+                and the queue, to which the options given away to them are sent
+        """
+
+        #initializing the decision log - the stack of branching points of the current branch; each entry is a list: 
+        #[identifier of the branching point, position on the trail (backtracking mode 'trail'), list of options not taken yet, snapshot of the agenda, dependency set of the closed branches]
+        #each option not taken yet is a pair: (copy of the interpretation to which it will be applied (backtracking mode 'copy'; None in the mode 'trail'), option)
+        decision_log = []
+
+        #identifiers of the branching points (they grow with the depth of the branching points in the decision log)
+        if branch_ids is None:
+            branch_ids = count(1)
                 
-                #results of applying the rule: interpretation, True/False, True/False, list of alternative interpretations (possibly empty)
-                new_interpretation, inconsistency_found, rule_applied, new_alt_interpretations = rule(self.interpretation)  
+        #the agenda of tasks for the rules (see the script "agenda"); when a new branch is explored, the tasks from the branching point are restored
+        agenda = Agenda(rules_to_apply, rules.triggers, _agenda_heuristic(heuristic), rules.heuristic_rules)
+        self.interpretation.set_agenda(agenda)
+        if snapshot is None:
+            agenda.refill(self.interpretation)
+        else:
+            agenda.restore(snapshot, self.interpretation)
+
+        #counter of iterations; the budgets (and the idle workers of the parallel mode) are checked only when it reaches "next_check"
+        steps = 0
+        next_check = 0
+
+
+        while True:
+
+            #take the next task of the rule with the highest priority
+            next_task = agenda.pop(self.interpretation)
+
+            if next_task is None: #no more rules to apply - the formula is satisfiable
+                self.is_satisfiable = True
+                break
+
+            if steps >= next_check:
+                #here we check the budgets; if one of them is exceeded, formula is considered a time-out 
+                self.exceeded_budget = self._exceeded_budget(budgets, decision_log)
+                if self.exceeded_budget is not None:
+                    self.time_out = True
+                    break
+
+                #parallel mode: if some of the workers are idle, an option not taken yet is given away to them
+                if idle_workers is not None and idle_workers.value > 0:
+                    self._donate(decision_log, rules_to_apply, heuristic, donations)
+
+                #at most one rule is applied in each iteration, so the limit of rules is not crossed before the next check
+                next_check = steps + CHECK_INTERVAL
+                if budgets['rules'] is not None:
+                    next_check = min(next_check, steps + budgets['rules'] - self.no_rules_applied)
+            steps += 1
+
+            priority, task = next_task
                 
-                if inconsistency_found:
-                    self.closed_branches_count += 1
-                    self.no_rules_applied += 1
-                    
-                    if len(alternative_interpretations) == 0: #no more "alternative interpretations" - stop building the tableau - it is not satisfiable
-                        self.is_satisfiable = False
-                        break
+            #results of applying the rule: interpretation, True/False, True/False, list of options of a branching rule (possibly empty)
+            new_interpretation, inconsistency_found, rule_applied, options = rules_to_apply[priority](self.interpretation, task)  
+            
+            if inconsistency_found:
+                self.closed_branches_count += 1
+                self.no_rules_applied += 1
+
+                #the branching points on which the clash depends (without backjumping - all the branching points of the branch)
+                clash_deps = self.interpretation._clash_deps if backjumping else {decision[0] for decision in decision_log}
+
+                #jumping back to the latest branching point on which the clash depends and which has an option not taken yet
+                while len(decision_log) > 0:
+                    branch_id, trail_mark, remaining_options, snapshot, closed_deps = decision_log[-1]
+                    if branch_id not in clash_deps: #the remaining options would be closed by the same clash
+                        self.pruned_branches_count += len(remaining_options)
+                        decision_log.pop()
+                    elif len(remaining_options) == 0: #all options are closed - the clashes depend on the branching points on which the clashes in all the options depend
+                        clash_deps = (clash_deps | closed_deps) - {branch_id}
+                        decision_log.pop()
                     else:
-                        self.interpretation = alternative_interpretations.pop() #pick the first available interpretation from a list, if a branch has been closed
+                        decision_log[-1][4] = closed_deps | (clash_deps - {branch_id})
                         break
 
-                elif rule_applied: #rule has been applied
-                    self.interpretation = new_interpretation
-                    self.no_rules_applied += 1
-                    alternative_interpretations.extend(new_alt_interpretations)  #add new "alternative interpretations" to the list - if there are any to add
-                    break  
+                if len(decision_log) == 0: #no more options to take - stop building the tableau - it is not satisfiable
+                    self.is_satisfiable = False
+                    break
+
+                #take the last option of the branching point: in the mode 'trail', on the interpretation restored to the state from before the branching point; 
+                #in the mode 'copy' - on the copy of the interpretation created at the branching point
+                alt_interpretation, option = remaining_options.pop()
+                if backtracking == 'trail':
+                    self.interpretation.undo_trail(trail_mark)
                 else:
-                    rules_iterator += 1    #rule has not been applied
-                        
-            if self.is_satisfiable == False:
-                break  #out of the whole while loop
+                    self.interpretation = alt_interpretation
+                    self.interpretation.set_agenda(agenda)
+                agenda.restore(snapshot, self.interpretation)
+                option(self.interpretation, frozenset({branch_id}))
+
+            elif rule_applied: #rule has been applied
+                self.interpretation = new_interpretation
+                self.no_rules_applied += 1
+
+                #the rule may be applicable to the same task again
+                agenda.push(priority, task)
+
+                if len(options) > 0: #branching rule - the first option is applied to the current interpretation, the others are kept for new branches (applied when the branch is explored)
+                    branch_id = next(branch_ids)
+                    if backtracking == 'trail':
+                        decision_log.append([branch_id, self.interpretation.trail_mark(), [(None, option) for option in options[1:]], agenda.snapshot(), frozenset()])
+                    else:
+                        decision_log.append([branch_id, None, [(self.interpretation.fork(), option) for option in options[1:]], agenda.snapshot(), frozenset()])
 
+                    options[0](self.interpretation, frozenset({branch_id}))
 
-        #if there are no more rules to apply and the formula is not a time out - it is satisfiable 
-        if self.is_satisfiable is None and self.time_out is False and rules_iterator == no_rules_to_apply:
-            self.is_satisfiable = True
 
 
+    def _exceeded_budget(self, budgets, decision_log):
+        """Return the name of the first exceeded budget (see build_tableau), or None if no budget is exceeded."""
+        if budgets['time'] is not None and time.monotonic() > budgets['time']:
+            return 'time'
+        if budgets['rules'] is not None and self.no_rules_applied >= budgets['rules']:
+            return 'rules'
+        if budgets['worlds'] is not None and len(self.interpretation.worlds()) > budgets['worlds']:
+            return 'worlds'
+        if budgets['frontier'] is not None and sum(len(decision[2]) for decision in decision_log) > budgets['frontier']:
+            return 'frontier'
+        if budgets['memory'] is not None and _memory_used() > budgets['memory']:
+            return 'memory'
+        return None
 
-        #PRINT OUT OF THE INTERPRETATION
-        #note - the interpretation should not be considered as a proper model! 
-        #print world(individual) names and formulas satisfied in the worlds
-        for w in self.interpretation.worlds():
-            
-            print(f"Individual name: {w._world_name_str} \n Concepts:")
-            for fml in set.union(*w._formulas.values()):
-                print("  ", fml)  #print the formulas in "nice" looking form
-            print("\n")
 
-        #print relations between worlds
-        for v1, w  in self.interpretation._outgoing.items():
-            if bool(w): #don't take into account worlds with no outging edges (bool(w) = dictionary w is not empty)
-                for v2, mod_types in w.items():
-                    for mod_type in mod_types:
-                        print(f"Role type: {mod_type} \n Origin individual: {v1._world_name_str} \n Destination individual: {v2._world_name_str} \n")
-
-        if self.is_satisfiable:
-            print("Input is satisfiable")
-        elif not self.is_satisfiable:
-            print("Input is not satisfiable")
-        elif self.is_satisfiable == None and self.time_out:
-            print("Time-out limit reached - no information about satisfiability")             
-            
-        return(self.time_out, self.is_satisfiable, self.closed_branches_count, self.no_rules_applied)
-    
+
+    def _donate(self, decision_log, rules_to_apply, heuristic, donations):
+        """Give away the option not taken yet of the oldest branching point (the option that would be explored last) to 
+        an idle worker of the parallel mode: the option is applied to its copy of the interpretation, which is sent, 
+        together with a snapshot of its agenda, to the queue "donations"."""
+        for i, decision in enumerate(decision_log):
+            if len(decision[2]) > 0:
+                alt_interpretation, option = decision[2].pop(0)
+
+                agenda = Agenda(rules_to_apply, rules.triggers, _agenda_heuristic(heuristic), rules.heuristic_rules)
+                alt_interpretation.set_agenda(agenda)
+                agenda.restore(decision[3], alt_interpretation)
+                option(alt_interpretation, frozenset({decision[0]}))
+                alt_interpretation.set_agenda(None)
+
+                #the clash in the option given away is not known here - it may depend on any of the earlier branching points, so backjumping must not skip them
+                decision[4] = decision[4].union(d[0] for d in decision_log[:i])
+
+                donations.put(('branch', alt_interpretation, agenda.snapshot()))
+                return
+
+
+
+    def _explore_parallel(self, rules_to_apply, backjumping, heuristic, workers, budgets):
+        """Explore the branches of the tableau in parallel, in a pool of worker processes (or-parallelism).
+
+        Each worker explores a branch, together with all the branches created on it, in the same way as _explore. When 
+        some workers are idle and no branch is waiting for them, the busy workers give away the options not taken yet of 
+        their oldest branching points (work stealing). All the workers are stopped as soon as one of them finds an open 
+        branch, to which no more rules can be applied; otherwise the tableau is closed when all the branches are closed. 
+        The numbers of closed branches, pruned branches and applied rules are summed over the workers.
+
+        Arguments (see build_tableau): workers - number of worker processes
+        """
+        context = multiprocessing.get_context()
+        tasks = context.Queue()     #branches waiting for a worker: (number of the branch, interpretation, snapshot of the agenda)
+        results = context.Queue()   #messages from the workers: branches given away and results of the explored branches
+        idle_workers = context.RawValue('i', 0)   #number of workers without a branch to explore, for which no branch is waiting (only set by this process)
+
+        processes = [context.Process(target = _parallel_worker, args = (tasks, results, idle_workers, rules_to_apply, backjumping, heuristic, budgets), daemon = True) 
+                     for i in range(workers)]
+        for process in processes:
+            process.start()
+
+        self.interpretation.set_agenda(None)
+        tasks.put((0, self.interpretation, None))
+        branches_count = 1   #number of branches sent to the workers
+        waiting, running = 1, 0   #numbers of branches waiting for a worker and being explored
+
+        try:
+            while waiting + running > 0:
+                try:
+                    message = results.get(timeout = None if budgets['time'] is None else max(budgets['time'] - time.monotonic(), 0) + 1)
+                except queue.Empty: #no answer from the workers within the time limit
+                    self.time_out = True
+                    self.exceeded_budget = 'time'
+                    break
+
+                if message[0] == 'branch':
+                    tasks.put((branches_count, message[1], message[2]))
+                    branches_count += 1
+                    waiting += 1
+                elif message[0] == 'start':
+                    waiting -= 1
+                    running += 1
+                else: #results of a branch: time-out, exceeded budget, satisfiability, closed branches, pruned branches, applied rules, final interpretation
+                    running -= 1
+                    time_out, exceeded_budget, is_satisfiable, closed_branches, pruned_branches, rules_applied, interpretation = message[1:]
+                    self.closed_branches_count += closed_branches
+                    self.pruned_branches_count += pruned_branches
+                    self.no_rules_applied += rules_applied
+                    if time_out or is_satisfiable:
+                        self.time_out, self.exceeded_budget, self.is_satisfiable = time_out, exceeded_budget, is_satisfiable
+                        if is_satisfiable:
+                            self.interpretation = interpretation
+                        break
+
+                idle_workers.value = max(workers - running - waiting, 0)
+
+            else: #all the branches are closed
+                self.is_satisfiable = False
+
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.join()
+
 
 
 
@@ -355,21 +601,60 @@ class DL_Tableau:
         #note - the interpretation should not be considered as a proper model 
 
         #print world names and formulas satisfied in the worlds
-        for w in self.initial_interpretation.worlds():
+        names = self.initial_interpretation.world_names()
+        for w, name in names.items():
             
-            print(f"Individual name: {w._world_name_str} \n Concepts:")
+            print(f"Individual name: {name} \n Concepts:")
             for fml in w._formulas:
                 print("  ", fml)  #print the formulas in "nice" looking form
             print("\n")
 
         #print relations between worlds       
-        for v1, w  in self.initial_interpretation._outgoing.items():
-            if bool(w): #don't take into account worlds with no outging edges (bool(w) = dictionary w is not empty)
-                for v2, mod_types in w.items():
-                    for mod_type in mod_types:
-                        print(f"Role type: {mod_type} \n Origin individual: {v1._world_name_str} \n Destination individual: {v2._world_name_str} \n")
+        for mod_type, v1, v2 in self.initial_interpretation.edges():
+            print(f"Role type: {mod_type} \n Origin individual: {names[v1]} \n Destination individual: {names[v2]} \n")
+
+
+
+
+def _parallel_worker(tasks, results, idle_workers, rules_to_apply, backjumping, heuristic, budgets):
+    """Worker process of the parallel mode of the tableau (see DL_Tableau._explore_parallel): explores the branches 
+    taken from the queue "tasks" and sends the results to the queue "results"."""
+    while True:
+        branch_no, branch_interpretation, snapshot = tasks.get()
+        results.put(('start',))
+
+        tab = DL_Tableau.__new__(DL_Tableau)
+        tab.interpretation = branch_interpretation
+        tab.time_out = False
+        tab.is_satisfiable = None
+        tab.no_rules_applied = 0
+        tab.closed_branches_count = 0
+        tab.pruned_branches_count = 0
+        tab.exceeded_budget = None
+
+        #identifiers of the branching points are unique among all the branches, since formulas given away still depend on the branching points of other workers
+        tab._explore(rules_to_apply, 'copy', backjumping, heuristic, budgets, snapshot, count(branch_no << 32 | 1), idle_workers, results)
+
+        tab.interpretation.set_agenda(None)
+        results.put(('result', tab.time_out, tab.exceeded_budget, tab.is_satisfiable, tab.closed_branches_count, tab.pruned_branches_count, tab.no_rules_applied, 
+                     tab.interpretation if tab.is_satisfiable else None))
+
 
 
+def _memory_used():
+    """Approximate memory (in megabytes) used by the process: its current resident set size on Linux, otherwise the 
+    peak resident set size (0 if it is not known)."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, AttributeError):
+        if resource is None:
+            return 0
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
 
 
 
+def _agenda_heuristic(heuristic: str):
+    """Return the function computing the keys of tasks for the agenda (see Agenda); None for the heuristic 'oldest', 
+    whose keys are all equal, so that the agenda simply takes the first task of the queue, without scoring the others."""
+    return None if heuristic == 'oldest' else HEURISTICS[heuristic]